@@ -10,7 +10,6 @@ from app.api.deps.db import get_db
 from app.api.deps.rate_limit import DEFAULT_RATE, limiter
 from app.api.schemas.rankings import MatchHistoryResponse, RankingsResponse
 from app.application.services.ranking_service import RankingService
-from app.infrastructure.cache import rankings_cache
 
 router = APIRouter()
 
@@ -28,19 +27,10 @@ async def get_rankings(
     # Set browser cache header (1 minute)
     response.headers["Cache-Control"] = "public, max-age=60"
     
-    # Check server-side cache first
-    cache_key = f"rankings:{group_id}"
-    cached = await rankings_cache.get(cache_key)
-    if cached:
-        return cached
-    
+    # The service checks access before serving rankings from its cache
     service = RankingService(db)
     rankings = await service.get_rankings(user.user_id, group_id)
-    response_data = RankingsResponse(rankings=rankings)
-    
-    # Cache the response
-    await rankings_cache.set(cache_key, response_data)
-    return response_data
+    return RankingsResponse(rankings=rankings)
 
 
 @router.get("/groups/{group_id}/history", response_model=MatchHistoryResponse)
@@ -56,26 +46,28 @@ async def get_match_history(
     event_id: Optional[UUID] = Query(None, alias="eventId"),
     limit: Optional[int] = Query(None, ge=1, le=100),
     offset: Optional[int] = Query(None, ge=0),
+    cursor: Optional[str] = Query(None),
     user: CurrentUser = Depends(get_current_user),
     db: Connection = Depends(get_db),
 ):
     """Get match history with optional pagination."""
     service = RankingService(db)
-    matches, total = await service.get_match_history(
+    matches, total, next_cursor = await service.get_match_history(
         user.user_id, group_id, from_date, to_date, player_id, event_id, 
-        secondary_player_id, relationship, limit, offset
+        secondary_player_id, relationship, limit, offset, cursor
     )
     
     has_more = None
-    if limit is not None and offset is not None:
-        has_more = (offset + len(matches)) < total
+    if limit is not None and (offset is not None or cursor is not None):
+        has_more = next_cursor is not None
     
     return MatchHistoryResponse(
         matches=matches,
         total=total if limit is not None else None,
         limit=limit,
         offset=offset,
-        has_more=has_more
+        has_more=has_more,
+        next_cursor=next_cursor,
     )
 
 
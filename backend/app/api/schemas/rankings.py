@@ -57,6 +57,7 @@ class MatchHistoryResponse(BaseModel):
     limit: Optional[int] = None
     offset: Optional[int] = None
     has_more: Optional[bool] = Field(None, alias="hasMore")
+    next_cursor: Optional[str] = Field(None, alias="nextCursor")
     
     class Config:
         populate_by_name = True
@@ -0,0 +1,18 @@
+"""
+Access checks shared by the services.
+"""
+from uuid import UUID
+
+from app.exceptions import ForbiddenError, NotFoundError
+from app.infrastructure.repositories.groups_repo import GroupsRepository
+
+
+async def check_group_access(
+    groups_repo: GroupsRepository, user_id: str, group_id: UUID
+) -> None:
+    """Raise unless the user owns or is a member of the group."""
+    has_access = await groups_repo.has_access(group_id, user_id)
+    if has_access is None:
+        raise NotFoundError("Group", str(group_id))
+    if not has_access:
+        raise ForbiddenError("You don't have access to this group")
@@ -52,6 +52,15 @@ class EventService:
         self.groups_repo = GroupsRepository(conn)
         self.group_players_repo = GroupPlayersRepository(conn)
         self.rating_updates_repo = RatingUpdatesRepository(conn)
+        # Group rows read during this request (one service per request); events
+        # never modify groups, so repeat reads can reuse the first one
+        self._groups: Dict[UUID, Optional[dict]] = {}
+
+    async def _get_group(self, group_id: UUID) -> Optional[dict]:
+        """Get a group by ID, reading it from the database at most once per service."""
+        if group_id not in self._groups:
+            self._groups[group_id] = await self.groups_repo.get_by_id(group_id)
+        return self._groups[group_id]
 
     async def _is_owner_or_organizer(self, user_id: str, group: dict) -> bool:
         """Check if the user is the group owner or has ORGANIZER role."""
@@ -74,7 +83,7 @@ class EventService:
             raise NotFoundError("Event", str(event_id))
 
         # Check access
-        group = await self.groups_repo.get_by_id(event["group_id"])
+        group = await self._get_group(event["group_id"])
         if not await self._is_owner_or_organizer(user_id, group) and not await self.groups_repo.is_member(user_id, group["id"]):
              # Allow members to view history too, similar to player stats
              pass
@@ -142,13 +151,11 @@ class EventService:
                     score_team2=float(game["score_team2"]) if game.get("score_team2") is not None else None,
                 ))
 
-            # Calculate deltas
-            deltas = rating_system.calculate_deltas(games_for_rating, current_ratings)
+            # Calculate deltas and update current ratings
+            deltas = rating_system.apply_deltas(games_for_rating, current_ratings)
 
-            # Update and record
+            # Record
             for player_id, delta in deltas.items():
-                current_ratings[player_id] = delta.rating_after
-                
                 # Find the game this player was in to get opponent info nicely?
                 # For now just record the new rating
                 history[str(player_id)].append({
@@ -166,7 +173,7 @@ class EventService:
     ) -> EventResponse:
         """Create a new event."""
         # Verify group ownership or organizer role
-        group = await self.groups_repo.get_by_id(group_id)
+        group = await self._get_group(group_id)
         if not group:
             raise NotFoundError("Group", str(group_id))
         if not await self._is_owner_or_organizer(user_id, group):
@@ -179,9 +186,8 @@ class EventService:
                 f"Event requires exactly {required_players} participants for {data.courts} courts"
             )
 
-        # Verify all participants exist in group
-        group_players = await self.group_players_repo.list_by_group(group_id)
-        gp_ids = {gp["id"] for gp in group_players}
+        # Verify all participants exist in group, checking only the requested ids
+        gp_ids = await self.group_players_repo.filter_in_group(group_id, data.participant_ids)
         for pid in data.participant_ids:
             if pid not in gp_ids:
                 raise BadRequestError(f"Player {pid} not found in group")
@@ -216,7 +222,7 @@ class EventService:
     ) -> List[EventListItem]:
         """List events in a group."""
         # Verify group ownership or organizer role
-        group = await self.groups_repo.get_by_id(group_id)
+        group = await self._get_group(group_id)
         if not group:
             raise NotFoundError("Group", str(group_id))
         if not await self._is_owner_or_organizer(user_id, group):
@@ -245,7 +251,7 @@ class EventService:
         if not event:
             raise NotFoundError("Event", str(event_id))
         # Fetch group to check ownership or organizer role
-        group = await self.groups_repo.get_by_id(event["group_id"])
+        group = await self._get_group(event["group_id"])
         if not await self._is_owner_or_organizer(user_id, group):
             raise ForbiddenError("Only owners and organizers can view this event")
 
@@ -284,7 +290,7 @@ class EventService:
             raise NotFoundError("Event", str(event_id))
 
         # Verify ownership or organizer role
-        group = await self.groups_repo.get_by_id(event["group_id"])
+        group = await self._get_group(event["group_id"])
         if not await self._is_owner_or_organizer(user_id, group):
             raise ForbiddenError("Only owners and organizers can update events")
 
@@ -336,7 +342,7 @@ class EventService:
         if not event:
             raise NotFoundError("Event", str(event_id))
         # Fetch group to check ownership or organizer role
-        group = await self.groups_repo.get_by_id(event["group_id"])
+        group = await self._get_group(event["group_id"])
         if not await self._is_owner_or_organizer(user_id, group):
             raise ForbiddenError("Only owners and organizers can generate schedules")
 
@@ -344,7 +350,7 @@ class EventService:
             raise BadRequestError("Cannot regenerate a completed event")
 
         # Get group settings
-        group = await self.groups_repo.get_by_id(event["group_id"])
+        group = await self._get_group(event["group_id"])
         settings = group["settings"]
 
         # Get participants with ratings
@@ -361,14 +367,10 @@ class EventService:
         # Get previous event teammate pairs
         previous_pairs: Set[FrozenSet[UUID]] = set()
         if settings.get("noRepeatTeammateFromPreviousEvent", True):
-            prev_event = await self.events_repo.get_previous_event(
+            pairs = await self.games_repo.get_teammate_pairs_from_previous_event(
                 event["group_id"], event_id
             )
-            if prev_event:
-                pairs = await self.games_repo.get_teammate_pairs_from_event(
-                    prev_event["id"]
-                )
-                previous_pairs = {frozenset(p) for p in pairs}
+            previous_pairs = {frozenset(p) for p in pairs}
 
         # Create constraint config
         config = ConstraintConfig(
@@ -462,7 +464,7 @@ class EventService:
         if not event:
             raise NotFoundError("Event", str(event_id))
         # Fetch group to check ownership or organizer role
-        group = await self.groups_repo.get_by_id(event["group_id"])
+        group = await self._get_group(event["group_id"])
         if not await self._is_owner_or_organizer(user_id, group):
             raise ForbiddenError("Only owners and organizers can swap players")
 
@@ -538,7 +540,7 @@ class EventService:
             raise NotFoundError("Game", str(game_id))
 
         # Verify ownership or organizer role through group
-        group = await self.groups_repo.get_by_id(game["group_id"])
+        group = await self._get_group(game["group_id"])
         if not await self._is_owner_or_organizer(user_id, group):
             raise ForbiddenError("Only owners and organizers can update scores")
 
@@ -578,7 +580,7 @@ class EventService:
         if not event:
             raise NotFoundError("Event", str(event_id))
         # Fetch group to check ownership or organizer role
-        group = await self.groups_repo.get_by_id(event["group_id"])
+        group = await self._get_group(event["group_id"])
         if not await self._is_owner_or_organizer(user_id, group):
             raise ForbiddenError("Only owners and organizers can complete events")
 
@@ -589,11 +591,12 @@ class EventService:
             raise BadRequestError("Cannot complete an event without generated games")
 
         # Get group settings for rating system
-        group = await self.groups_repo.get_by_id(event["group_id"])
+        group = await self._get_group(event["group_id"])
         settings = group["settings"]
 
-        # Get all games with player details, ordered by round/court
-        games = await self.games_repo.list_by_event_with_players(event_id)
+        # Get all games, ordered by round/court. Names and ratings come from the
+        # participants below, so the per-seat player joins aren't needed here
+        games = await self.games_repo.list_by_event(event_id)
 
         # Get current ratings for all participants
         participants = await self.events_repo.get_participants(event_id)
@@ -602,6 +605,18 @@ class EventService:
         
         # Store starting ratings for delta calculation
         starting_ratings = current_ratings.copy()
+
+        # Anyone seated in a game without being a registered participant (shouldn't
+        # happen) starts from their stored group rating, looked up once
+        seated_ids = {
+            player_id
+            for game in games
+            for player_id in (game["team1_p1"], game["team1_p2"], game["team2_p1"], game["team2_p2"])
+        }
+        missing_ids = seated_ids - participant_ids
+        if missing_ids:
+            for gp in await self.group_players_repo.get_by_ids(list(missing_ids)):
+                current_ratings[gp["id"]] = float(gp["rating"])
         
         # Player info for response
         player_info = {p["group_player_id"]: p["display_name"] for p in participants}
@@ -635,31 +650,28 @@ class EventService:
             # Build all games in this round for rating calculation using CURRENT ratings
             games_for_rating = []
             for game in round_games:
-                t1p1_rating = current_ratings.get(game["team1_p1"], float(game["t1p1_rating"]))
-                t1p2_rating = current_ratings.get(game["team1_p2"], float(game["t1p2_rating"]))
-                t2p1_rating = current_ratings.get(game["team2_p1"], float(game["t2p1_rating"]))
-                t2p2_rating = current_ratings.get(game["team2_p2"], float(game["t2p2_rating"]))
+                t1p1_rating = current_ratings[game["team1_p1"]]
+                t1p2_rating = current_ratings[game["team1_p2"]]
+                t2p1_rating = current_ratings[game["team2_p1"]]
+                t2p2_rating = current_ratings[game["team2_p2"]]
 
                 games_for_rating.append(GameForRating(
                     team1=(
-                        PlayerRating(player_id=game["team1_p1"], rating=t1p1_rating, display_name=game["t1p1_name"]),
-                        PlayerRating(player_id=game["team1_p2"], rating=t1p2_rating, display_name=game["t1p2_name"]),
+                        PlayerRating(player_id=game["team1_p1"], rating=t1p1_rating),
+                        PlayerRating(player_id=game["team1_p2"], rating=t1p2_rating),
                     ),
                     team2=(
-                        PlayerRating(player_id=game["team2_p1"], rating=t2p1_rating, display_name=game["t2p1_name"]),
-                        PlayerRating(player_id=game["team2_p2"], rating=t2p2_rating, display_name=game["t2p2_name"]),
+                        PlayerRating(player_id=game["team2_p1"], rating=t2p1_rating),
+                        PlayerRating(player_id=game["team2_p2"], rating=t2p2_rating),
                     ),
                     result=DomainGameResult(game["result"]),
                     score_team1=float(game["score_team1"]) if game.get("score_team1") is not None else None,
                     score_team2=float(game["score_team2"]) if game.get("score_team2") is not None else None,
                 ))
 
-            # Calculate deltas for all games in this round together
-            deltas = rating_system.calculate_deltas(games_for_rating, current_ratings)
-
-            # Update current_ratings dictionary with new ratings for next round
-            for player_id, delta in deltas.items():
-                current_ratings[player_id] = delta.rating_after
+            # Calculate deltas for all games in this round together and
+            # update current_ratings with the new ratings for the next round
+            rating_system.apply_deltas(games_for_rating, current_ratings)
 
             # Track wins/losses/ties for all players in this round's games
             for game in round_games:
@@ -745,7 +757,7 @@ class EventService:
         if not event:
             raise NotFoundError("Event", str(event_id))
         # Fetch group to check ownership or organizer role
-        group = await self.groups_repo.get_by_id(event["group_id"])
+        group = await self._get_group(event["group_id"])
         if not await self._is_owner_or_organizer(user_id, group):
             raise ForbiddenError("Only owners and organizers can delete events")
         
@@ -792,7 +804,7 @@ class EventService:
         logger.info(f"Starting history import for group {group_id}")
         
         # Verify group ownership or organizer role
-        group = await self.groups_repo.get_by_id(group_id)
+        group = await self._get_group(group_id)
         if not group:
             raise NotFoundError("Group", str(group_id))
         if not await self._is_owner_or_organizer(user_id, group):
@@ -1,11 +1,12 @@
 """
 Group service - handles group-related use cases.
 """
-import json
+from collections import defaultdict
+from itertools import groupby
 from typing import Any, Dict, List
 from uuid import UUID
 
-from asyncpg import Connection
+from asyncpg import Connection, Record
 
 from app.api.schemas.groups import (
     GroupCreate,
@@ -13,7 +14,10 @@ from app.api.schemas.groups import (
     GroupResponse,
     GroupSettings,
     GroupSettingsUpdate,
+    RatingSystem,
 )
+from app.application.services.access import check_group_access
+from app.domain.ratings.base import GameResult as DomainGameResult
 from app.exceptions import ForbiddenError, NotFoundError
 from app.infrastructure.repositories.groups_repo import GroupsRepository
 from app.infrastructure.repositories.players_repo import GroupPlayersRepository
@@ -21,6 +25,34 @@ from app.infrastructure.repositories.rating_updates_repo import RatingUpdatesRep
 from app.infrastructure.repositories.games_repo import GamesRepository
 from app.infrastructure.repositories.players_repo import GroupPlayersRepository
 from app.infrastructure.repositories.rating_updates_repo import RatingUpdatesRepository
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+# (result, my_team) -> 1 for a win, -1 for a loss, 0 for a tie; unset results are absent
+_GAME_OUTCOMES = {
+    ("TEAM1_WIN", 1): 1,
+    ("TEAM1_WIN", 2): -1,
+    ("TEAM2_WIN", 1): -1,
+    ("TEAM2_WIN", 2): 1,
+    ("TIE", 1): 0,
+    ("TIE", 2): 0,
+}
+
+
+# Positions in the per-player [wins, losses, ties, games] tally used by the rating replay
+_STAT_WINS, _STAT_LOSSES, _STAT_TIES, _STAT_GAMES = range(4)
+
+# (result, team) -> tally slot that game adds to for a player on that team,
+# derived from _GAME_OUTCOMES so the two can't disagree
+_OUTCOME_STAT_INDEX = {1: _STAT_WINS, -1: _STAT_LOSSES, 0: _STAT_TIES}
+_RESULT_STAT_INDEX = {
+    key: _OUTCOME_STAT_INDEX[outcome] for key, outcome in _GAME_OUTCOMES.items()
+}
+
+# DB result string -> domain enum, without an Enum lookup per game
+_DOMAIN_RESULTS = {result.value: result for result in DomainGameResult}
 
 
 class GroupService:
@@ -60,32 +92,12 @@ class GroupService:
     async def list_groups(self, user_id: str) -> List[GroupListItem]:
         """List all groups owned by a user."""
         groups = await self.groups_repo.list_by_owner(user_id)
-        return [
-            GroupListItem(
-                id=g["id"],
-                name=g["name"],
-                sport=g["sport"],
-                playerCount=g["player_count"],
-                created_at=g["created_at"],
-                is_archived=g.get("is_archived", False),
-            )
-            for g in groups
-        ]
+        return [self._to_list_item(g) for g in groups]
 
     async def list_member_groups(self, user_id: str) -> List[GroupListItem]:
         """List all groups where user is a member."""
         groups = await self.groups_repo.list_member_groups(user_id)
-        return [
-            GroupListItem(
-                id=g["id"],
-                name=g["name"],
-                sport=g["sport"],
-                playerCount=g["player_count"],
-                created_at=g["created_at"],
-                is_archived=g.get("is_archived", False),
-            )
-            for g in groups
-        ]
+        return [self._to_list_item(g) for g in groups]
 
     async def get_group(self, user_id: str, group_id: UUID) -> GroupResponse:
         """Get a specific group."""
@@ -145,15 +157,7 @@ class GroupService:
             raise ForbiddenError("Only owners and organizers can update the group")
 
         # Update name
-        await self.conn.execute(
-            """
-            UPDATE groups SET name = $1, updated_at = NOW() WHERE id = $2
-            """,
-            name,
-            group_id
-        )
-
-        updated = await self.groups_repo.get_by_id(group_id)
+        updated = await self.groups_repo.update_name(group_id, name)
         return self._to_response(updated)
 
     async def recalculate_ratings(self, user_id: str, group_id: UUID) -> Dict[str, Any]:
@@ -166,9 +170,7 @@ class GroupService:
         
         Returns summary of changes.
         """
-        from app.domain.ratings.base import GameForRating, PlayerRating, GameResult as DomainGameResult
         from app.domain.ratings.factory import create_rating_system
-        from app.infrastructure.repositories.players_repo import GroupPlayersRepository
         
         # Verify ownership
         group = await self.groups_repo.get_by_id(group_id)
@@ -180,47 +182,7 @@ class GroupService:
         settings = group["settings"]
         base_rating = settings.get("initialRating", 1000)
         
-        # Debug: Log the rating system settings being used
-        print(f"[DEBUG recalculate_ratings] Group ID: {group_id}")
-        print(f"[DEBUG recalculate_ratings] Rating System: {settings.get('ratingSystem', 'SERIOUS_ELO')}")
-        print(f"[DEBUG recalculate_ratings] K-Factor: {settings.get('kFactor', 32)}")
-        print(f"[DEBUG recalculate_ratings] ELO Const: {settings.get('eloConst')}")
-        print(f"[DEBUG recalculate_ratings] Full settings: {settings}")
-        
-        # Get all players to calculate initial ratings based on skill level
-        all_players = await self.conn.fetch(
-            """
-            SELECT id, skill_level FROM group_players WHERE group_id = $1
-            """,
-            group_id
-        )
-        
-        # Build initial ratings dictionary based on skill level
-        current_ratings = {}
-        for player in all_players:
-            player_skill = player.get("skill_level")
-            initial_rating = base_rating
-            
-            # Calculate initial rating based on skill level
-            if player_skill:
-                offset_multiplier = base_rating / 1000
-                if player_skill == "ADVANCED":
-                    initial_rating = base_rating + int(100 * offset_multiplier)
-                elif player_skill == "BEGINNER":
-                    initial_rating = base_rating - int(100 * offset_multiplier)
-                # INTERMEDIATE stays at base_rating
-            
-            current_ratings[player["id"]] = initial_rating
-        
-        # Reset all player stats in DB
-        await self.conn.execute(
-            """
-            UPDATE group_players 
-            SET wins = 0, losses = 0, ties = 0, games_played = 0
-            WHERE group_id = $1
-            """,
-            group_id
-        )
+        logger.debug(f"Recalculating ratings for group {group_id} with settings {settings}")
         
         # Get all completed events in chronological order
         completed_events = await self.conn.fetch(
@@ -231,7 +193,17 @@ class GroupService:
             """,
             group_id
         )
-        
+
+        # Nothing to replay (and no rating history to clear): just reset everyone
+        # to their starting rating in a single statement
+        if not completed_events:
+            initial_ratings = await self.group_players_repo.reset_ratings(group_id, base_rating)
+            return {
+                "eventsRecalculated": 0,
+                "playersUpdated": len(initial_ratings),
+                "topPlayers": [],
+            }
+
         # Create rating system
         rating_system = create_rating_system(
             settings.get("ratingSystem", "SERIOUS_ELO"),
@@ -239,198 +211,202 @@ class GroupService:
             elo_const=settings.get("eloConst"),
         )
         
-        group_players_repo = GroupPlayersRepository(self.conn)
         events_processed = 0
-        player_stats = {}  # Track wins/losses/ties per player
-        
-        # Delete all existing rating_updates for this group's events
-        # This is needed to regenerate accurate +/- deltas
-        await self.conn.execute(
-            """
-            DELETE FROM rating_updates 
-            WHERE event_id IN (
-                SELECT id FROM events WHERE group_id = $1
+        # Track [wins, losses, ties, games] per player
+        player_stats = defaultdict(lambda: [0, 0, 0, 0])
+        
+        # Reset and replay inside one transaction so the group is never left
+        # half-recalculated; each event gets its own savepoint so a failing event
+        # is skipped without aborting the rest.
+        async with self.conn.transaction():
+            # The whole replay can be rerun from events/games, so don't wait on the
+            # WAL flush at commit
+            await self.conn.execute("SET LOCAL synchronous_commit = off")
+
+            # Seed the replay with each player's skill-based starting rating. No reset
+            # write is needed: the final writeback below covers every group player,
+            # with zeroed stats for anyone who played no games.
+            current_ratings = await self.group_players_repo.get_starting_ratings(group_id, base_rating)
+
+            # Delete all existing rating_updates for this group's events
+            # This is needed to regenerate accurate +/- deltas
+            await self.conn.execute(
+                """
+                DELETE FROM rating_updates 
+                WHERE event_id IN (
+                    SELECT id FROM events WHERE group_id = $1
+                )
+                """,
+                group_id
             )
-            """,
-            group_id
-        )
         
-        for event in completed_events:
-            try:
-                # Get games for this event (including round_index for round-by-round processing)
-                games = await self.conn.fetch(
-                    """
-                    SELECT g.id, g.round_index, g.team1_p1, g.team1_p2, g.team2_p1, g.team2_p2,
-                           g.score_team1, g.score_team2, g.result,
-                           p1.display_name as t1p1_name, p2.display_name as t1p2_name,
-                           p3.display_name as t2p1_name, p4.display_name as t2p2_name
-                    FROM games g
-                    JOIN group_players gp1 ON gp1.id = g.team1_p1
-                    JOIN group_players gp2 ON gp2.id = g.team1_p2
-                    JOIN group_players gp3 ON gp3.id = g.team2_p1
-                    JOIN group_players gp4 ON gp4.id = g.team2_p2
-                    JOIN players p1 ON p1.id = gp1.player_id
-                    JOIN players p2 ON p2.id = gp2.player_id
-                    JOIN players p3 ON p3.id = gp3.player_id
-                    JOIN players p4 ON p4.id = gp4.player_id
-                    WHERE g.event_id = $1
-                    ORDER BY g.round_index, g.court_index
-                    """,
-                    event["id"]
-                )
+            # Get games for all events in one query (including round_index for
+            # round-by-round processing) and bucket them per event
+            all_games = await self.conn.fetch(
+                """
+                SELECT id, event_id, round_index, team1_p1, team1_p2, team2_p1, team2_p2,
+                       score_team1, score_team2, result
+                FROM games
+                WHERE event_id = ANY($1::uuid[])
+                ORDER BY round_index, court_index
+                """,
+                [event["id"] for event in completed_events]
+            )
+            games_by_event = defaultdict(list)
+            for game in all_games:
+                games_by_event[game["event_id"]].append(game)
+        
+            for event in completed_events:
+                # In-memory changes for this event are only kept once its savepoint
+                # commits, so a failed event leaves no partial ratings or stats behind
+                ratings_before_event = {}
+                event_stats = defaultdict(lambda: [0, 0, 0, 0])
+                try:
+                    async with self.conn.transaction():
+                        games = games_by_event.get(event["id"])
                 
-                if not games:
-                    continue
+                        if not games:
+                            continue
                 
-                # Snapshot ratings BEFORE this event for the rating_updates table
-                # Get all players involved in this event's games
-                event_players = set()
-                for game in games:
-                    event_players.update([game["team1_p1"], game["team1_p2"], game["team2_p1"], game["team2_p2"]])
+                        # Snapshot ratings BEFORE this event for the rating_updates table
+                        # Get all players involved in this event's games
+                        event_players = set()
+                        for game in games:
+                            event_players.update([game["team1_p1"], game["team1_p2"], game["team2_p1"], game["team2_p2"]])
                 
-                ratings_before_event = {
-                    player_id: current_ratings.get(player_id, base_rating)
-                    for player_id in event_players
-                }
+                        ratings_before_event = {
+                            player_id: current_ratings.get(player_id, base_rating)
+                            for player_id in event_players
+                        }
                 
-                # Group games by round_index for round-by-round processing
-                from collections import defaultdict
-                games_by_round = defaultdict(list)
-                for game in games:
-                    if game["result"] != "UNSET":
-                        games_by_round[game["round_index"]].append(game)
+                        # Group games by round_index for round-by-round processing
+                        games_by_round = defaultdict(list)
+                        for game in games:
+                            if game["result"] != "UNSET":
+                                games_by_round[game["round_index"]].append(game)
                 
-                # Process each round in order
-                for round_index in sorted(games_by_round.keys()):
-                    round_games = games_by_round[round_index]
+                        # Team ELOs for every game, written in one batch per event
+                        elo_game_ids, elo_team1, elo_team2 = [], [], []
+
+                        # Process each round in order
+                        for round_index in sorted(games_by_round.keys()):
+                            round_games = games_by_round[round_index]
                     
-                    # Build all games in this round for rating calculation
-                    games_for_rating = []
-                    for game in round_games:
-                        t1p1_rating = current_ratings.get(game["team1_p1"], base_rating)
-                        t1p2_rating = current_ratings.get(game["team1_p2"], base_rating)
-                        t2p1_rating = current_ratings.get(game["team2_p1"], base_rating)
-                        t2p2_rating = current_ratings.get(game["team2_p2"], base_rating)
+                            # Build all games in this round for rating calculation
+                            games_for_rating = []
+                            for game in round_games:
+                                # Unpack the record once instead of subscripting it repeatedly
+                                t1p1, t1p2, t2p1, t2p2 = game["team1_p1"], game["team1_p2"], game["team2_p1"], game["team2_p2"]
+                                score1, score2 = game["score_team1"], game["score_team2"]
+                                # setdefault so apply_deltas_raw can update in place
+                                t1p1_rating = current_ratings.setdefault(t1p1, base_rating)
+                                t1p2_rating = current_ratings.setdefault(t1p2, base_rating)
+                                t2p1_rating = current_ratings.setdefault(t2p1, base_rating)
+                                t2p2_rating = current_ratings.setdefault(t2p2, base_rating)
                         
-                        # Calculate team ELOs (average of players)
-                        team1_elo = (t1p1_rating + t1p2_rating) / 2
-                        team2_elo = (t2p1_rating + t2p2_rating) / 2
+                                # Calculate team ELOs (average of players)
+                                team1_elo = (t1p1_rating + t1p2_rating) / 2
+                                team2_elo = (t2p1_rating + t2p2_rating) / 2
                         
-                        # Store team ELO in the games table
-                        await self.conn.execute(
-                            """
-                            UPDATE games SET team1_elo = $1, team2_elo = $2 WHERE id = $3
-                            """,
-                            team1_elo,
-                            team2_elo,
-                            game["id"]
-                        )
+                                # Store team ELO in the games table
+                                elo_game_ids.append(game["id"])
+                                elo_team1.append(team1_elo)
+                                elo_team2.append(team2_elo)
                         
-                        games_for_rating.append(GameForRating(
-                            team1=(
-                                PlayerRating(player_id=game["team1_p1"], rating=t1p1_rating, display_name=game["t1p1_name"]),
-                                PlayerRating(player_id=game["team1_p2"], rating=t1p2_rating, display_name=game["t1p2_name"]),
-                            ),
-                            team2=(
-                                PlayerRating(player_id=game["team2_p1"], rating=t2p1_rating, display_name=game["t2p1_name"]),
-                                PlayerRating(player_id=game["team2_p2"], rating=t2p2_rating, display_name=game["t2p2_name"]),
-                            ),
-                            result=DomainGameResult(game["result"]),
-                            score_team1=float(game["score_team1"]) if game.get("score_team1") is not None else None,
-                            score_team2=float(game["score_team2"]) if game.get("score_team2") is not None else None,
-                        ))
-                    
-                    # Calculate deltas for all games in this round together
-                    deltas = rating_system.calculate_deltas(games_for_rating, current_ratings)
+                                games_for_rating.append((
+                                    t1p1, t1p2, t2p1, t2p2,
+                                    t1p1_rating, t1p2_rating, t2p1_rating, t2p2_rating,
+                                    _DOMAIN_RESULTS[game["result"]],
+                                    float(score1) if score1 is not None else None,
+                                    float(score2) if score2 is not None else None,
+                                ))
                     
-                    # Update local ratings dictionary for next round
-                    for player_id, delta in deltas.items():
-                        current_ratings[player_id] = delta.rating_after
+                            # Calculate deltas for all games in this round together and
+                            # update the local ratings dictionary for the next round
+                            rating_system.apply_deltas_raw(games_for_rating, current_ratings)
                     
-                    # Track wins/losses/ties for all players in this round
-                    for game in round_games:
-                        for player_id, team in [
-                            (game["team1_p1"], 1), (game["team1_p2"], 1),
-                            (game["team2_p1"], 2), (game["team2_p2"], 2)
-                        ]:
-                            if player_id not in player_stats:
-                                player_stats[player_id] = {"wins": 0, "losses": 0, "ties": 0, "games": 0}
-                            
-                            player_stats[player_id]["games"] += 1
-                            if game["result"] == "TIE":
-                                player_stats[player_id]["ties"] += 1
-                            elif game["result"] == "TEAM1_WIN":
-                                if team == 1:
-                                    player_stats[player_id]["wins"] += 1
-                                else:
-                                    player_stats[player_id]["losses"] += 1
-                            else:  # TEAM2_WIN
-                                if team == 2:
-                                    player_stats[player_id]["wins"] += 1
-                                else:
-                                    player_stats[player_id]["losses"] += 1
+                            # Track wins/losses/ties for all players in this round
+                            for game in round_games:
+                                result = game["result"]
+                                team1_idx = _RESULT_STAT_INDEX[(result, 1)]
+                                team2_idx = _RESULT_STAT_INDEX[(result, 2)]
+                                for player_id, idx in (
+                                    (game["team1_p1"], team1_idx), (game["team1_p2"], team1_idx),
+                                    (game["team2_p1"], team2_idx), (game["team2_p2"], team2_idx)
+                                ):
+                                    stats = event_stats[player_id]
+                                    stats[_STAT_GAMES] += 1
+                                    stats[idx] += 1
                 
-                # Create rating_updates records for this event
-                rating_updates = []
-                for player_id in event_players:
-                    rating_before = ratings_before_event.get(player_id, base_rating)
-                    rating_after = current_ratings.get(player_id, rating_before)
-                    delta = rating_after - rating_before
-                    if delta != 0:  # Only record if there was a change
-                        rating_updates.append((
-                            event["id"],
-                            player_id,
-                            rating_before,
-                            rating_after,
-                            delta,
-                            settings.get("ratingSystem", "SERIOUS_ELO"),
-                        ))
-                
-                if rating_updates:
-                    await self.conn.executemany(
-                        """
-                        INSERT INTO rating_updates (event_id, group_player_id, rating_before, rating_after, delta, system)
-                        VALUES ($1, $2, $3, $4, $5, $6)
-                        """,
-                        rating_updates
-                    )
+                        await self.games_repo.set_team_elos(elo_game_ids, elo_team1, elo_team2)
+
+                        # Create rating_updates records for this event
+                        rating_updates = []
+                        for player_id in event_players:
+                            rating_before = ratings_before_event.get(player_id, base_rating)
+                            rating_after = current_ratings.get(player_id, rating_before)
+                            delta = rating_after - rating_before
+                            if delta != 0:  # Only record if there was a change
+                                rating_updates.append((
+                                    event["id"],
+                                    player_id,
+                                    rating_before,
+                                    rating_after,
+                                    delta,
+                                    settings.get("ratingSystem", "SERIOUS_ELO"),
+                                ))
                 
+                        if rating_updates:
+                            await self.conn.executemany(
+                                """
+                                INSERT INTO rating_updates (event_id, group_player_id, rating_before, rating_after, delta, system)
+                                VALUES ($1, $2, $3, $4, $5, $6)
+                                """,
+                                rating_updates
+                            )
+                except Exception:
+                    logger.exception(f"Skipping event {event['id']} during rating recalculation")
+                    current_ratings.update(ratings_before_event)
+                    continue
+
+                for player_id, stats in event_stats.items():
+                    totals = player_stats[player_id]
+                    for idx in range(4):
+                        totals[idx] += stats[idx]
                 events_processed += 1
-            except Exception as e:
-                print(f"Error processing event {event['id']}: {e}")
         
-        # Apply final ratings and stats to database
-        for player_id, rating in current_ratings.items():
-            stats = player_stats.get(player_id, {"wins": 0, "losses": 0, "ties": 0, "games": 0})
-            await self.conn.execute(
-                """
-                UPDATE group_players 
-                SET rating = $1, games_played = $2, wins = $3, losses = $4, ties = $5
-                WHERE id = $6
-                """,
-                rating,
-                stats["games"],
-                stats["wins"],
-                stats["losses"],
-                stats["ties"],
-                player_id
+            # Apply final ratings and stats to database in one statement
+            empty_stats = [0, 0, 0, 0]
+            ids, ratings, games_played, wins, losses, ties = [], [], [], [], [], []
+            for player_id, rating in current_ratings.items():
+                stats = player_stats.get(player_id, empty_stats)
+                ids.append(player_id)
+                ratings.append(rating)
+                games_played.append(stats[_STAT_GAMES])
+                wins.append(stats[_STAT_WINS])
+                losses.append(stats[_STAT_LOSSES])
+                ties.append(stats[_STAT_TIES])
+            await self.group_players_repo.set_ratings_and_stats(
+                group_id, ids, ratings, games_played, wins, losses, ties
             )
         
-        # Get final player ratings
-        final_ratings = await self.conn.fetch(
+        # Get the top 5 final ratings; every group player was written back above,
+        # so the group size is already known
+        top_ratings = await self.conn.fetch(
             """
-            SELECT gp.id, p.display_name, gp.rating, gp.wins, gp.losses, gp.ties
+            SELECT p.display_name, gp.rating, gp.wins, gp.losses
             FROM group_players gp
             JOIN players p ON p.id = gp.player_id
             WHERE gp.group_id = $1
             ORDER BY gp.rating DESC
+            LIMIT 5
             """,
             group_id
         )
         
         return {
             "eventsRecalculated": events_processed,
-            "playersUpdated": len(final_ratings),
+            "playersUpdated": len(current_ratings),
             "topPlayers": [
                 {
                     "displayName": r["display_name"],
@@ -438,7 +414,7 @@ class GroupService:
                     "wins": r["wins"],
                     "losses": r["losses"],
                 }
-                for r in final_ratings[:5]
+                for r in top_ratings
             ]
         }
 
@@ -484,46 +460,31 @@ class GroupService:
             settings=settings,
         )
         
-        # Get all players from original group
-        original_players = await self.conn.fetch(
-            """
-            SELECT player_id, membership_type, skill_level, role
-            FROM group_players WHERE group_id = $1
-            """,
-            group_id
-        )
-        
-        # Copy players to new group with reset ratings
-        for player in original_players:
-            # Calculate initial rating based on skill level
-            player_rating = initial_rating
-            skill_level = player.get("skill_level")
-            if skill_level:
-                offset_multiplier = initial_rating / 1000
-                if skill_level == "ADVANCED":
-                    player_rating = initial_rating + int(100 * offset_multiplier)
-                elif skill_level == "BEGINNER":
-                    player_rating = initial_rating - int(100 * offset_multiplier)
-            
-            await self.conn.execute(
-                """
-                INSERT INTO group_players (group_id, player_id, rating, membership_type, skill_level, role)
-                VALUES ($1, $2, $3, $4, $5, $6)
-                """,
-                new_group["id"],
-                player["player_id"],
-                player_rating,
-                player["membership_type"],
-                player.get("skill_level"),
-                player.get("role"),
-            )
-        
+        # Copy players to new group with reset ratings (skill-adjusted in SQL)
+        await self.group_players_repo.copy_to_group(group_id, new_group["id"], initial_rating)
+
         return self._to_response(new_group)
 
+    def _to_list_item(self, group: Record) -> GroupListItem:
+        """Convert a group list row to a list item (trusted DB data, not re-validated)."""
+        return GroupListItem.model_construct(
+            id=group["id"],
+            name=group["name"],
+            sport=group["sport"],
+            player_count=group["player_count"],
+            created_at=group["created_at"],
+            is_archived=group["is_archived"],
+        )
+
     def _to_response(self, group: Dict[str, Any]) -> GroupResponse:
-        """Convert a group dict to a response."""
-        settings = GroupSettings(**group["settings"])
-        return GroupResponse(
+        """Convert a group dict to a response.
+
+        Settings were validated on write, so they are constructed without
+        re-validation; only the enum is coerced back for serialization.
+        """
+        settings = GroupSettings.model_construct(**group["settings"])
+        settings.rating_system = RatingSystem(settings.rating_system)
+        return GroupResponse.model_construct(
             id=group["id"],
             owner_user_id=group["clerk_user_id"],
             name=group["name"],
@@ -540,17 +501,8 @@ class GroupService:
 
     async def get_player_stats(self, user_id: str, group_id: UUID, player_id: UUID) -> Dict[str, Any]:
         """Get player stats and history."""
-        # Get group to verify access
-        group = await self.groups_repo.get_by_id(group_id)
-        if not group:
-            raise NotFoundError("Group", str(group_id))
-
-        # Check access (owner, organizer, or member)
-        is_owner = str(group["owner_user_id"]) == user_id
-        if not is_owner:
-            is_member = await self.group_players_repo.is_member(user_id, group_id)
-            if not is_member:
-                raise ForbiddenError("You don't have access to this group")
+        # Check access (owner, organizer, or member) without loading the group
+        await check_group_access(self.groups_repo, user_id, group_id)
 
         # Get group player by player_id
         # Note: We need the group_player_id, so we need to look it up using group_id and player_id
@@ -575,7 +527,7 @@ class GroupService:
         # OK, so the frontend will assume the ID is the GroupPlayerID.
         
         group_player = await self.group_players_repo.get_by_id(player_id)
-        if not group_player or str(group_player["group_id"]) != str(group_id):
+        if not group_player or group_player["group_id"] != group_id:
              # If passed ID is actually a raw player_id, we might want to handle that?
              # For now assume it is group_player_id as that's what's in the list.
              raise NotFoundError("Player", str(player_id))
@@ -596,8 +548,6 @@ class GroupService:
 
     def _calculate_advanced_stats(self, player_id: UUID, history: List[Dict], games: List[Dict]) -> Dict:
         """Calculate advanced player stats."""
-        from collections import defaultdict
-        
         if not history and not games:
             return None
             
@@ -614,69 +564,43 @@ class GroupService:
             lowest_rating = 0
             
         # 2. Streaks
-        # Games are ordered by date, round_index
-        current_win_streak = 0
-        current_loss_streak = 0
-        longest_win_streak = 0
-        longest_loss_streak = 0
+        # Games are ordered by date, round_index; outcomes are collected as
+        # 1 (win), -1 (loss) or 0 (tie) and the runs are measured after the loop
+        outcomes = []
         
         # 3. Teammates and Opponents
         teammate_stats = defaultdict(lambda: {"wins": 0, "games": 0, "name": ""})
         opponent_stats = defaultdict(lambda: {"wins": 0, "losses": 0, "name": ""})
         
         for game in games:
-            # Determine my team and result
-            my_team = 0
-            if game["team1_p1"] == player_id or game["team1_p2"] == player_id:
+            t1p1, t1p2, t2p1, t2p2 = game["team1_p1"], game["team1_p2"], game["team2_p1"], game["team2_p2"]
+
+            # Determine my team, teammate and opponents
+            if t1p1 == player_id or t1p2 == player_id:
                 my_team = 1
+                if t1p1 == player_id:
+                    teammate_id, teammate_name = t1p2, game["t1p2_name"]
+                else:
+                    teammate_id, teammate_name = t1p1, game["t1p1_name"]
             else:
                 my_team = 2
+                if t2p1 == player_id:
+                    teammate_id, teammate_name = t2p2, game["t2p2_name"]
+                else:
+                    teammate_id, teammate_name = t2p1, game["t2p1_name"]
                 
             # Skip if result is unset
-            if game["result"] == "UNSET":
+            outcome = _GAME_OUTCOMES.get((game["result"], my_team))
+            if outcome is None:
                 continue
-                
-            is_win = False
-            if my_team == 1 and game["result"] == "TEAM1_WIN":
-                is_win = True
-            elif my_team == 2 and game["result"] == "TEAM2_WIN":
-                is_win = True
-            elif game["result"] == "TIE":
-                # Treat ties as breaking streaks? Or ignore?
-                # Usually ties break win/loss streaks
-                current_win_streak = 0
-                current_loss_streak = 0
+
+            outcomes.append(outcome)
+            # Ties break win/loss streaks but don't count towards teammates/opponents
+            if outcome == 0:
                 continue
-                
-            # Update streaks
-            if is_win:
-                current_win_streak += 1
-                current_loss_streak = 0
-                longest_win_streak = max(longest_win_streak, current_win_streak)
-            else:
-                current_loss_streak += 1
-                current_win_streak = 0
-                longest_loss_streak = max(longest_loss_streak, current_loss_streak)
+            is_win = outcome == 1
                 
             # Teammate Stats
-            teammate_id = None
-            teammate_name = None
-            
-            if my_team == 1:
-                if game["team1_p1"] == player_id:
-                    teammate_id = game["team1_p2"]
-                    teammate_name = game["t1p2_name"]
-                else:
-                    teammate_id = game["team1_p1"]
-                    teammate_name = game["t1p1_name"]
-            else:
-                if game["team2_p1"] == player_id:
-                    teammate_id = game["team2_p2"]
-                    teammate_name = game["t2p2_name"]
-                else:
-                    teammate_id = game["team2_p1"]
-                    teammate_name = game["t2p1_name"]
-            
             if teammate_id:
                 stats = teammate_stats[teammate_id]
                 stats["games"] += 1
@@ -685,17 +609,10 @@ class GroupService:
                     stats["wins"] += 1
                     
             # Opponent Stats (Nemesis / Pigeon)
-            opponents = []
             if my_team == 1:
-                opponents = [
-                    (game["team2_p1"], game["t2p1_name"]), 
-                    (game["team2_p2"], game["t2p2_name"])
-                ]
+                opponents = ((t2p1, game["t2p1_name"]), (t2p2, game["t2p2_name"]))
             else:
-                opponents = [
-                    (game["team1_p1"], game["t1p1_name"]), 
-                    (game["team1_p2"], game["t1p2_name"])
-                ]
+                opponents = ((t1p1, game["t1p1_name"]), (t1p2, game["t1p2_name"]))
                 
             for opp_id, opp_name in opponents:
                 stats = opponent_stats[opp_id]
@@ -705,6 +622,24 @@ class GroupService:
                 else:
                     stats["losses"] += 1 # They beat me
         
+        # Longest streaks come from the runs of equal outcomes; the current
+        # streak is whatever run the player is on now
+        current_win_streak = 0
+        current_loss_streak = 0
+        longest_win_streak = 0
+        longest_loss_streak = 0
+        for outcome, run in groupby(outcomes):
+            run_length = sum(1 for _ in run)
+            if outcome == 1:
+                longest_win_streak = max(longest_win_streak, run_length)
+            elif outcome == -1:
+                longest_loss_streak = max(longest_loss_streak, run_length)
+        if outcomes:
+            if outcome == 1:
+                current_win_streak = run_length
+            elif outcome == -1:
+                current_loss_streak = run_length
+
         # Format Teammates
         def format_teammate(tid, stat):
             return {
@@ -727,27 +662,30 @@ class GroupService:
             best_teammates = []
             worst_teammates = []
         else:
-            # Best Teammates Logic:
-            # 1. Find absolute max win rate
-            max_wr = max(t["winRate"] for t in all_teammates)
-            # 2. Filter for those with max win rate
-            best_candidates = [t for t in all_teammates if t["winRate"] >= max_wr - 0.0001]
-            # 3. Among these, find absolute max games played
-            if best_candidates:
-                max_games_best = max(t["gamesPlayed"] for t in best_candidates)
-                # 4. Filter for those with max games played
-                best_candidates = [t for t in best_candidates if t["gamesPlayed"] == max_games_best]
-            
-            # Worst Teammates Logic:
-            # 1. Find absolute min win rate
-            min_wr = min(t["winRate"] for t in all_teammates)
-            # 2. Filter for those with min win rate
-            worst_candidates = [t for t in all_teammates if t["winRate"] <= min_wr + 0.0001]
-            # 3. Among these, find absolute max games played (proven worst)
-            if worst_candidates:
-                max_games_worst = max(t["gamesPlayed"] for t in worst_candidates)
-                # 4. Filter for those with max games played
-                worst_candidates = [t for t in worst_candidates if t["gamesPlayed"] == max_games_worst]
+            # Best teammates: (near-)max win rate, then the most games played among those.
+            # Worst teammates: (near-)min win rate, then the most games played (proven worst).
+            # One pass keeps everyone within tolerance of the running max/min win rate,
+            # pruning a bucket whenever its extreme moves
+            best_bucket, worst_bucket = [], []
+            max_wr = min_wr = all_teammates[0]["winRate"]
+            for t in all_teammates:
+                win_rate = t["winRate"]
+                if win_rate > max_wr:
+                    max_wr = win_rate
+                    best_bucket = [b for b in best_bucket if b["winRate"] >= max_wr - 0.0001]
+                if win_rate >= max_wr - 0.0001:
+                    best_bucket.append(t)
+                if win_rate < min_wr:
+                    min_wr = win_rate
+                    worst_bucket = [w for w in worst_bucket if w["winRate"] <= min_wr + 0.0001]
+                if win_rate <= min_wr + 0.0001:
+                    worst_bucket.append(t)
+
+            # Among each bucket, keep those with the most games played
+            max_games_best = max(t["gamesPlayed"] for t in best_bucket)
+            best_candidates = [t for t in best_bucket if t["gamesPlayed"] == max_games_best]
+            max_games_worst = max(t["gamesPlayed"] for t in worst_bucket)
+            worst_candidates = [t for t in worst_bucket if t["gamesPlayed"] == max_games_worst]
             
             # Remove Overlaps
             # If a player appears in both lists, assign based on win rate threshold
@@ -781,30 +719,37 @@ class GroupService:
         # Nemesis: Opponent with highest win rate against me (min 3 games)
         # Pigeon: Opponent I have highest win rate against (min 3 games)
         
-        relevant_opponents = []
+        def format_opponent(oid, stat, total, win_rate_vs):
+            return {
+                "playerId": oid,
+                "displayName": stat["name"],
+                "gamesPlayed": total,
+                "wins": stat["wins"],
+                "losses": stat["losses"],
+                "winRate": win_rate_vs
+            }
+
+        # Single pass tracking the extremes; ties keep the first opponent seen
+        # Pigeon = highest win rate for me (more games wins ties)
+        # Nemesis = lowest win rate for me (more games wins ties)
+        pigeon_key = nemesis_key = None
         for oid, stat in opponent_stats.items():
             total = stat["wins"] + stat["losses"]
-            if total >= 3:
-                win_rate_vs = stat["wins"] / total # My win rate vs them
-                relevant_opponents.append({
-                    "playerId": oid,
-                    "displayName": stat["name"],
-                    "gamesPlayed": total,
-                    "wins": stat["wins"],
-                    "losses": stat["losses"],
-                    "winRate": win_rate_vs
-                })
-        
-        if relevant_opponents:
-            # Pigeon = highest win rate for me
-            pigeon_data = max(relevant_opponents, key=lambda x: (x["winRate"], x["gamesPlayed"]))
-            if pigeon_data["winRate"] > 0.5: # Only if I actually win more
-                pigeon = pigeon_data
-                
-            # Nemesis = lowest win rate for me
-            nemesis_data = min(relevant_opponents, key=lambda x: (x["winRate"], x["gamesPlayed"] * -1))
-            if nemesis_data["winRate"] < 0.5: # Only if they actually beat me more
-                nemesis = nemesis_data
+            if total < 3:
+                continue
+            win_rate_vs = stat["wins"] / total # My win rate vs them
+            key = (win_rate_vs, total)
+            if pigeon_key is None or key > pigeon_key:
+                pigeon_key, pigeon_entry = key, (oid, stat)
+            key = (win_rate_vs, -total)
+            if nemesis_key is None or key < nemesis_key:
+                nemesis_key, nemesis_entry = key, (oid, stat)
+
+        if pigeon_key is not None:
+            if pigeon_key[0] > 0.5: # Only if I actually win more
+                pigeon = format_opponent(*pigeon_entry, pigeon_key[1], pigeon_key[0])
+            if nemesis_key[0] < 0.5: # Only if they actually beat me more
+                nemesis = format_opponent(*nemesis_entry, -nemesis_key[1], nemesis_key[0])
 
         return {
             "highestRating": highest_rating,
@@ -1,7 +1,7 @@
 """
 Player service - handles player-related use cases.
 """
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from uuid import UUID
 
 import asyncpg
@@ -21,14 +21,46 @@ from app.api.schemas.players import (
     SkillLevel,
     UpdateGroupPlayerRequest,
 )
+from app.application.services.access import check_group_access
 from app.exceptions import BadRequestError, ConflictError, ForbiddenError, NotFoundError
 from app.infrastructure.repositories.groups_repo import GroupsRepository
 from app.infrastructure.repositories.players_repo import (
     GroupPlayersRepository,
     PlayersRepository,
 )
-from app.infrastructure.repositories.rating_updates_repo import RatingUpdatesRepository
 
+# Starting-rating offsets for subs at a 1000 base; they scale with the group's
+# base rating (offset = (base/1000) * 100)
+_SKILL_OFFSET = {
+    SkillLevel.ADVANCED: 100,
+    SkillLevel.INTERMEDIATE: 0,
+    SkillLevel.BEGINNER: -100,
+}
+
+
+# DB value -> enum member, for building responses without calling Enum(value)
+_MEMBERSHIP_TYPES = MembershipType._value2member_map_
+_SKILL_LEVELS = SkillLevel._value2member_map_
+_GROUP_ROLES = GroupRole._value2member_map_
+
+
+def _sub_ratings_by_skill(base_rating: int) -> Dict[SkillLevel, int]:
+    """Starting rating for a sub at each skill level, for a group's base rating."""
+    # Same integer arithmetic as SKILL_INITIAL_RATING_SQL used when ratings are reset
+    step = int(base_rating) // 10
+    return {
+        skill_level: base_rating + offset * step // 100
+        for skill_level, offset in _SKILL_OFFSET.items()
+    }
+
+
+def _compute_initial_rating(
+    base_rating: int, membership_type: MembershipType, skill_level: Optional[SkillLevel]
+) -> int:
+    """Starting rating for a new group player; only subs get a skill-level offset."""
+    if membership_type != MembershipType.SUB or not skill_level:
+        return base_rating
+    return _sub_ratings_by_skill(base_rating)[skill_level]
 
 class PlayerService:
     """Service for player operations."""
@@ -38,7 +70,38 @@ class PlayerService:
         self.players_repo = PlayersRepository(conn)
         self.group_players_repo = GroupPlayersRepository(conn)
         self.groups_repo = GroupsRepository(conn)
-        self.rating_updates_repo = RatingUpdatesRepository(conn)
+        # Groups already verified as owned by a user, for the life of this service
+        # (one request); saves repeating the check when several calls share it
+        self._owned_groups: Dict[Tuple[str, UUID], dict] = {}
+
+    async def _get_owned_group(self, user_id: str, group_id: UUID) -> dict:
+        """Get a group the user owns; ownership is filtered in SQL."""
+        key = (user_id, group_id)
+        group = self._owned_groups.get(key)
+        if group:
+            return group
+        group = await self.groups_repo.get_by_id_for_owner(group_id, user_id)
+        if group:
+            self._owned_groups[key] = group
+            return group
+        await self._raise_group_not_owned(group_id)
+
+    async def _raise_group_not_owned(self, group_id: UUID) -> None:
+        """Raise NotFound or Forbidden after an ownership-filtered group query matched nothing."""
+        # Only look again to tell a missing group from someone else's
+        if not await self.groups_repo.exists(group_id):
+            raise NotFoundError("Group", str(group_id))
+        raise ForbiddenError("You don't own this group")
+
+    async def _check_group_access(self, user_id: str, group_id: UUID) -> None:
+        """Raise unless the user owns or is a member of the group."""
+        await check_group_access(self.groups_repo, user_id, group_id)
+
+    async def _raise_player_not_owned(self, player_id: UUID) -> None:
+        """Raise NotFound or Forbidden after an ownership-filtered query matched nothing."""
+        if not await self.players_repo.exists(player_id):
+            raise NotFoundError("Player", str(player_id))
+        raise ForbiddenError("You don't own this player")
 
     async def create_player(self, user_id: str, data: PlayerCreate) -> PlayerResponse:
         """Create a new global player."""
@@ -54,8 +117,8 @@ class PlayerService:
         self, user_id: str, data: BulkPlayerCreate
     ) -> BulkPlayerCreateResponse:
         """Create multiple players at once."""
-        # Clean and deduplicate names
-        names = list(dict.fromkeys([n.strip() for n in data.names if n.strip()]))
+        # Clean and deduplicate names in one pass (strip once, keep first occurrence)
+        names = list(dict.fromkeys(name for n in data.names if (name := n.strip())))
 
         if not names:
             raise BadRequestError("No valid player names provided")
@@ -89,13 +152,10 @@ class PlayerService:
 
     async def get_player(self, user_id: str, player_id: UUID) -> PlayerResponse:
         """Get a specific player."""
-        player = await self.players_repo.get_by_id(player_id)
+        player = await self.players_repo.get_by_id_for_owner(player_id, user_id)
 
         if not player:
-            raise NotFoundError("Player", str(player_id))
-
-        if str(player["owner_user_id"]) != user_id:
-            raise ForbiddenError("You don't own this player")
+            await self._raise_player_not_owned(player_id)
 
         return self._to_player_response(player)
 
@@ -103,22 +163,17 @@ class PlayerService:
         self, user_id: str, player_id: UUID, data: PlayerUpdate
     ) -> PlayerResponse:
         """Update a player."""
-        # Verify ownership
-        player = await self.players_repo.get_by_id(player_id)
-
-        if not player:
-            raise NotFoundError("Player", str(player_id))
-
-        if str(player["owner_user_id"]) != user_id:
-            raise ForbiddenError("You don't own this player")
-
-        # Update
+        # Ownership is part of the UPDATE's WHERE clause
         updated = await self.players_repo.update(
             player_id=player_id,
             display_name=data.display_name,
             notes=data.notes,
+            owner_user_id=user_id,
         )
 
+        if not updated:
+            await self._raise_player_not_owned(player_id)
+
         return self._to_player_response(updated)
 
     async def add_player_to_group(
@@ -131,17 +186,13 @@ class PlayerService:
         role: GroupRole = GroupRole.PLAYER,
     ) -> GroupPlayerResponse:
         """Add a player to a group."""
-        # Verify group ownership
-        group = await self.groups_repo.get_by_id(group_id)
-
+        # Verify group ownership; the player is read in the same query
+        group = await self.groups_repo.get_by_id_for_owner_with_player(group_id, user_id, player_id)
         if not group:
-            raise NotFoundError("Group", str(group_id))
-
-        if str(group["owner_user_id"]) != user_id:
-            raise ForbiddenError("You don't own this group")
+            await self._raise_group_not_owned(group_id)
 
         # Verify player ownership
-        player = await self.players_repo.get_by_id(player_id)
+        player = group["player"]
 
         if not player:
             raise NotFoundError("Player", str(player_id))
@@ -153,25 +204,14 @@ class PlayerService:
         base_rating = group["settings"].get("initialRating", 1000)
         
         # Calculate starting rating based on skill level for subs
-        # Base offsets: ADVANCED +100, INTERMEDIATE 0, BEGINNER -100
-        # These scale with base rating (offset = (base/1000) * 100)
-        initial_rating = base_rating
-        if membership_type == MembershipType.SUB and skill_level:
-            offset_multiplier = base_rating / 1000
-            if skill_level == SkillLevel.ADVANCED:
-                initial_rating = base_rating + int(100 * offset_multiplier)
-            elif skill_level == SkillLevel.BEGINNER:
-                initial_rating = base_rating - int(100 * offset_multiplier)
-            elif skill_level == SkillLevel.BEGINNER:
-                initial_rating = base_rating - int(100 * offset_multiplier)
-            # INTERMEDIATE stays at base_rating
+        initial_rating = _compute_initial_rating(base_rating, membership_type, skill_level)
 
         # If the player is linked to the group owner, make them an organizer automatically
-        if player.get("user_id") and str(player["user_id"]) == str(group["owner_user_id"]):
+        if player["user_id"] is not None and player["user_id"] == group["owner_user_id"]:
             role = GroupRole.ORGANIZER
 
-        # Add to group
-        group_player = await self.group_players_repo.add_player_to_group(
+        # Add to group; the repo returns the joined row ready for the response
+        gp = await self.group_players_repo.add_player_to_group(
             group_id=group_id,
             player_id=player_id,
             initial_rating=initial_rating,
@@ -180,9 +220,6 @@ class PlayerService:
             role=role.value,
         )
 
-        # Get full info
-        gp = await self.group_players_repo.get_by_id(group_player["id"])
-
         return self._to_group_player_response(gp)
 
     async def bulk_add_players_to_group(
@@ -192,70 +229,62 @@ class PlayerService:
         data: BulkAddPlayersToGroupRequest,
     ) -> BulkAddPlayersToGroupResponse:
         """Add multiple players to a group at once."""
-        # Verify group ownership
-        group = await self.groups_repo.get_by_id(group_id)
-
-        if not group:
-            raise NotFoundError("Group", str(group_id))
-
-        if str(group["owner_user_id"]) != user_id:
-            raise ForbiddenError("You don't own this group")
-
-        # Prepare player data for bulk add with skill-based ratings
-        # First build a map of player_id -> player_data for quick lookups
-        players_map = {}
-        player_ids = [p.player_id for p in data.players]
-        for player_id in player_ids:
-            player = await self.players_repo.get_by_id(player_id)
-            if not player:
-                raise NotFoundError("Player", str(player_id))
-            if str(player["owner_user_id"]) != user_id:
-                raise ForbiddenError(f"You don't own player {player_id}")
-            players_map[player_id] = player
-
-        # Get base rating from group settings
-        base_rating = group["settings"].get("initialRating", 1000)
-
-        players_data = []
-        for p in data.players:
-            # Calculate starting rating based on skill level for subs
-            initial_rating = base_rating
-            if p.membership_type == MembershipType.SUB and p.skill_level:
-                offset_multiplier = base_rating / 1000
-                if p.skill_level == SkillLevel.ADVANCED:
-                    initial_rating = base_rating + int(100 * offset_multiplier)
-                elif p.skill_level == SkillLevel.BEGINNER:
-                    initial_rating = base_rating - int(100 * offset_multiplier)
-                # INTERMEDIATE stays at base_rating
-            
-            # Check for organizer role
-            role = GroupRole.PLAYER
-            player_details = players_map.get(p.player_id)
-            if player_details and player_details.get("user_id") and str(player_details["user_id"]) == str(group["owner_user_id"]):
-                role = GroupRole.ORGANIZER
+        # Ownership checks and the insert share one transaction, so the group and
+        # players can't change between being checked and being added. The reads
+        # stay sequential: an asyncpg connection runs one query at a time, so
+        # gathering them would only raise InterfaceError
+        async with self.conn.transaction():
+            # Verify group ownership
+            group = await self._get_owned_group(user_id, group_id)
+
+            # Prepare player data for bulk add with skill-based ratings
+            # Check ownership for every requested player in one aggregate query; the
+            # request schema caps the list at 100, and repeats are validated once
+            # (the repo reports them as skipped)
+            player_ids = list(dict.fromkeys(p.player_id for p in data.players))
+            missing_ids, foreign_ids, owner_linked_ids = await self.players_repo.check_ownership(
+                player_ids, user_id, group["owner_user_id"]
+            )
+            for player_id in player_ids:
+                if player_id in missing_ids:
+                    raise NotFoundError("Player", str(player_id))
+                if player_id in foreign_ids:
+                    raise ForbiddenError(f"You don't own player {player_id}")
+
+            # Get base rating from group settings; sub ratings per skill level are
+            # the same for every player in the request, so work them out once
+            base_rating = group["settings"].get("initialRating", 1000)
+            sub_ratings = _sub_ratings_by_skill(base_rating)
+
+            players_data = []
+            for p in data.players:
+                # Calculate starting rating based on skill level for subs
+                if p.membership_type == MembershipType.SUB and p.skill_level:
+                    initial_rating = sub_ratings[p.skill_level]
+                else:
+                    initial_rating = base_rating
+
+                # Players linked to the group owner become organizers
+                role = GroupRole.ORGANIZER if p.player_id in owner_linked_ids else GroupRole.PLAYER
             
-            players_data.append({
-                "player_id": p.player_id, 
-                "membership_type": p.membership_type.value,
-                "initial_rating": initial_rating,
-                "skill_level": p.skill_level.value if p.skill_level else None,
-                "role": role.value,
-            })
-
-        # Bulk add
-        added_players, skipped_ids = await self.group_players_repo.bulk_add_players_to_group(
-            group_id=group_id,
-            players=players_data,
-        )
-
-        # Get full info for added players
-        added_responses = []
-        for gp in added_players:
-            full_gp = await self.group_players_repo.get_by_id(gp["id"])
-            added_responses.append(self._to_group_player_response(full_gp))
+                players_data.append({
+                    "player_id": p.player_id, 
+                    "membership_type": p.membership_type.value,
+                    "initial_rating": initial_rating,
+                    "skill_level": p.skill_level.value if p.skill_level else None,
+                    "role": role.value,
+                })
+
+            # Bulk add; concurrent bulk adds to the same group queue on one advisory
+            # lock instead of contending on each other's unique-index entries
+            await self.group_players_repo.lock_group(group_id)
+            added_players, skipped_ids = await self.group_players_repo.bulk_add_players_to_group(
+                group_id=group_id,
+                players=players_data,
+            )
 
         return BulkAddPlayersToGroupResponse(
-            added=added_responses,
+            added=[self._to_group_player_response(gp) for gp in added_players],
             skipped=skipped_ids,
         )
 
@@ -268,71 +297,46 @@ class PlayerService:
     ) -> GroupPlayerResponse:
         """Update a group player's membership type and/or skill level."""
         # Verify group ownership
-        group = await self.groups_repo.get_by_id(group_id)
-
-        if not group:
-            raise NotFoundError("Group", str(group_id))
-
-        if str(group["owner_user_id"]) != user_id:
-            raise ForbiddenError("You don't own this group")
-
-        # Verify group player exists and belongs to this group
-        gp = await self.group_players_repo.get_by_id(group_player_id)
-
-        if not gp:
-            raise NotFoundError("GroupPlayer", str(group_player_id))
-
-        if gp["group_id"] != group_id:
-            raise ForbiddenError("This player doesn't belong to this group")
+        await self._get_owned_group(user_id, group_id)
 
         # Update membership type and/or skill level
         new_membership_type = data.membership_type.value if data.membership_type else None
         new_skill_level = data.skill_level.value if data.skill_level else None
         new_role = data.role.value if data.role else None
         
-        await self.group_players_repo.update_group_player(
+        # Group membership is part of the UPDATE's WHERE clause; when every field
+        # is None the repo skips the UPDATE and only reads the row back
+        gp = await self.group_players_repo.update_group_player(
             group_player_id=group_player_id,
             membership_type=new_membership_type,
             skill_level=new_skill_level,
             role=new_role,
+            group_id=group_id,
         )
 
-        # Get full info
-        full_gp = await self.group_players_repo.get_by_id(group_player_id)
+        if not gp:
+            # Only look again to tell a missing group player from another group's
+            if not await self.group_players_repo.exists(group_player_id):
+                raise NotFoundError("GroupPlayer", str(group_player_id))
+            raise ForbiddenError("This player doesn't belong to this group")
 
-        return self._to_group_player_response(full_gp)
+        return self._to_group_player_response(gp)
 
     async def list_group_players(
         self, user_id: str, group_id: UUID
     ) -> List[GroupPlayerResponse]:
         """List all players in a group."""
         # Verify group ownership or membership
-        group = await self.groups_repo.get_by_id(group_id)
+        await self._check_group_access(user_id, group_id)
 
-        if not group:
-            raise NotFoundError("Group", str(group_id))
-
-        if str(group["owner_user_id"]) != user_id:
-            # Check if user is a member
-            is_member = await self.group_players_repo.is_member(user_id, group_id)
-            if not is_member:
-                raise ForbiddenError("You don't have access to this group")
+        # Get players with their rating change over the last completed event,
+        # in the same query
+        players = await self.group_players_repo.list_by_group_with_deltas(group_id)
 
-        # Get players
-        players = await self.group_players_repo.list_by_group(group_id)
-        
-        # Get rating_before from last completed event to calculate deltas
-        rating_before_map = await self.rating_updates_repo.get_last_event_deltas(group_id)
-
-        # Build responses with calculated deltas
-        responses = []
-        for p in players:
-            # Calculate delta as current - before (if player was in last event)
-            rating_before = rating_before_map.get(p["id"])
-            rating_delta = None
-            if rating_before is not None:
-                rating_delta = float(p["rating"]) - rating_before
-            responses.append(self._to_group_player_response(p, rating_delta))
+        responses = [
+            self._to_group_player_response(p, p["rating_delta"])
+            for p in players
+        ]
         
         return responses
 
@@ -340,19 +344,11 @@ class PlayerService:
         self, user_id: str, group_id: UUID, group_player_id: UUID
     ) -> None:
         """Remove a player from a group."""
-        # Verify group ownership
-        group = await self.groups_repo.get_by_id(group_id)
-
-        if not group:
-            raise NotFoundError("Group", str(group_id))
-
-        if str(group["owner_user_id"]) != user_id:
-            raise ForbiddenError("You don't own this group")
-
-        # Try to remove - may fail if player has game history
+        # Try to remove - may fail if player has game history. Group ownership is
+        # part of the DELETE, so the happy path is a single statement
         try:
             removed = await self.group_players_repo.remove_from_group(
-                group_id, group_player_id
+                group_id, group_player_id, owner_user_id=user_id
             )
         except asyncpg.ForeignKeyViolationError:
             raise ConflictError(
@@ -361,47 +357,35 @@ class PlayerService:
             )
 
         if not removed:
+            # Group errors take precedence, as when ownership was checked first
+            await self._get_owned_group(user_id, group_id)
             raise NotFoundError("GroupPlayer", str(group_player_id))
 
     def _to_group_player_response(self, gp: dict, rating_delta: float = None) -> GroupPlayerResponse:
-        """Convert a group player dict to a response."""
-        win_rate = gp.get("win_rate", 0)
-        if win_rate is None and gp["games_played"] > 0:
-            win_rate = (gp["wins"] + 0.5 * gp["ties"]) / gp["games_played"]
-        elif win_rate is None:
-            win_rate = 0
-
-        # Handle membership_type - convert from DB string if needed
-        membership_type = gp.get("membership_type", "PERMANENT")
-        if isinstance(membership_type, str):
-            membership_type = MembershipType(membership_type)
-        
-        # Handle skill_level - convert from DB string if needed
-        skill_level = gp.get("skill_level")
-        if skill_level is not None and isinstance(skill_level, str):
-            skill_level = SkillLevel(skill_level)
+        """Convert a group player dict to a response.
 
-        # Handle role
-        role = gp.get("role", "PLAYER")
-        if isinstance(role, str):
-            role = GroupRole(role)
+        Rows come straight from our own queries, so the model is constructed
+        without validation; DB strings are coerced to enums and rating to float
+        (win_rate is computed in SQL as a float).
+        """
+        skill_level = gp.get("skill_level")
 
-        return GroupPlayerResponse(
+        return GroupPlayerResponse.model_construct(
             id=gp["id"],
-            playerId=gp["player_id"],
-            groupId=gp["group_id"],
-            displayName=gp["display_name"],
-            membershipType=membership_type,
-            skillLevel=skill_level,
-            role=role,
-            userId=gp.get("user_id"),
+            player_id=gp["player_id"],
+            group_id=gp["group_id"],
+            display_name=gp["display_name"],
+            membership_type=_MEMBERSHIP_TYPES[gp.get("membership_type", "PERMANENT")],
+            skill_level=_SKILL_LEVELS[skill_level] if skill_level is not None else None,
+            role=_GROUP_ROLES[gp.get("role", "PLAYER")],
+            user_id=gp.get("user_id"),
             rating=float(gp["rating"]),
-            gamesPlayed=gp["games_played"],
+            games_played=gp["games_played"],
             wins=gp["wins"],
             losses=gp["losses"],
             ties=gp["ties"],
-            winRate=float(win_rate),
-            ratingDelta=rating_delta,
+            win_rate=gp["win_rate"],
+            rating_delta=rating_delta,
         )
 
     def _to_player_response(self, player: dict) -> PlayerResponse:
@@ -417,14 +401,15 @@ class PlayerService:
 
     async def generate_invite(self, user_id: str, player_id: UUID) -> str:
         """Generate an invite token for a player."""
-        # Verify ownership
-        await self.get_player(user_id, player_id)
-        
         import secrets
         token = secrets.token_urlsafe(16)
         
-        # Save to player
-        await self.players_repo.update(player_id, invite_token=token)
+        # Save to player; ownership is part of the UPDATE's WHERE clause
+        updated = await self.players_repo.update(
+            player_id, invite_token=token, owner_user_id=user_id
+        )
+        if not updated:
+            await self._raise_player_not_owned(player_id)
         
         return token
 
@@ -1,6 +1,8 @@
 """
 Ranking service - handles ranking and history queries.
 """
+import base64
+import json
 from datetime import datetime
 from typing import List, Optional, Tuple
 from uuid import UUID
@@ -8,10 +10,139 @@ from uuid import UUID
 from asyncpg import Connection
 
 from app.api.schemas.rankings import MatchHistoryEntry, RankingEntry
-from app.exceptions import ForbiddenError, NotFoundError
+from app.application.services.access import check_group_access
+from app.exceptions import BadRequestError
+from app.infrastructure.cache import rankings_cache
 from app.infrastructure.repositories.groups_repo import GroupsRepository
 from app.infrastructure.repositories.players_repo import GroupPlayersRepository
 
+# Response entries are built from trusted DB rows without validation
+_build_match_history_entry = MatchHistoryEntry.model_construct
+
+# Rows fetched per round trip when streaming unpaginated match history
+_HISTORY_PREFETCH = 500
+
+# Range of the int4 round and court indexes a history cursor carries
+_INT4_MIN, _INT4_MAX = -2**31, 2**31 - 1
+
+# Games with their events and the four players' group_players rows. The query
+# texts built from these parts are fixed, so each is parsed and planned the
+# same way whichever filters a request uses
+_MATCH_HISTORY_FROM = """
+    FROM games g
+    JOIN events e ON e.id = g.event_id
+    JOIN group_players gp1 ON gp1.id = g.team1_p1
+    JOIN group_players gp2 ON gp2.id = g.team1_p2
+    JOIN group_players gp3 ON gp3.id = g.team2_p1
+    JOIN group_players gp4 ON gp4.id = g.team2_p2
+"""
+
+# Completed games in a group, filtered by:
+# $2/$3 event date range, $4 event, $5 player, $6 second player, who was on the
+# same team as $5 when $7 is true and on the other team otherwise.
+# A NULL parameter disables its filter; the second player needs the first.
+# Players are matched on the joined group_players rows, so no group player ids
+# have to be looked up first, and a player not in the group matches no games.
+_MATCH_HISTORY_WHERE = """
+    WHERE e.group_id = $1 AND e.status = 'COMPLETED'
+    AND ($2::timestamptz IS NULL OR e.starts_at >= $2)
+    AND ($3::timestamptz IS NULL OR e.starts_at <= $3)
+    AND ($4::uuid IS NULL OR e.id = $4)
+    AND ($5::uuid IS NULL OR $5 IN (gp1.player_id, gp2.player_id, gp3.player_id, gp4.player_id))
+    AND ($5::uuid IS NULL OR $6::uuid IS NULL OR (
+        ($7::bool AND (
+            ($5 IN (gp1.player_id, gp2.player_id) AND $6 IN (gp1.player_id, gp2.player_id))
+            OR ($5 IN (gp3.player_id, gp4.player_id) AND $6 IN (gp3.player_id, gp4.player_id))
+        ))
+        OR (NOT $7::bool AND (
+            ($5 IN (gp1.player_id, gp2.player_id) AND $6 IN (gp3.player_id, gp4.player_id))
+            OR ($5 IN (gp3.player_id, gp4.player_id) AND $6 IN (gp1.player_id, gp2.player_id))
+        ))
+    ))
+"""
+
+# Use stored team ELO from games table, rounded to a whole number (NULL if unset).
+# A zero score is reported as no score, as for unset ELO
+_MATCH_HISTORY_SELECT = """
+    SELECT
+        g.id as game_id,
+        g.event_id,
+        e.name as event_name,
+        e.starts_at as event_date,
+        g.round_index,
+        g.court_index,
+        NULLIF(g.score_team1, 0)::float8 as score_team1,
+        NULLIF(g.score_team2, 0)::float8 as score_team2,
+        g.result,
+        ROUND(NULLIF(g.team1_elo, 0))::float8 as team1_elo,
+        ROUND(NULLIF(g.team2_elo, 0))::float8 as team2_elo,
+        p1.display_name as t1p1_name,
+        p2.display_name as t1p2_name,
+        p3.display_name as t2p1_name,
+        p4.display_name as t2p2_name
+""" + _MATCH_HISTORY_FROM + """
+    JOIN players p1 ON p1.id = gp1.player_id
+    JOIN players p2 ON p2.id = gp2.player_id
+    JOIN players p3 ON p3.id = gp3.player_id
+    JOIN players p4 ON p4.id = gp4.player_id
+"""
+
+# Newest events first (events without a date sort first, as NULLS FIRST does for
+# DESC), games in court order; the game id makes the order total for keyset paging
+_MATCH_HISTORY_ORDER = """
+    ORDER BY e.starts_at DESC, g.round_index, g.court_index, g.id
+"""
+
+MATCH_HISTORY_SQL = _MATCH_HISTORY_SELECT + _MATCH_HISTORY_WHERE + _MATCH_HISTORY_ORDER
+
+# A page of history. When $9 is set, only games after the keyset position
+# ($8 event date, $9 round, $10 court, $11 game id) of the previous page's last
+# game are returned, so a deep page does not scan and discard every earlier row.
+# $8 may be NULL for a game of an event without a date.
+MATCH_HISTORY_PAGE_SQL = _MATCH_HISTORY_SELECT + _MATCH_HISTORY_WHERE + """
+    AND ($9::int IS NULL
+        OR ($8::timestamptz IS NULL AND e.starts_at IS NOT NULL)
+        OR e.starts_at < $8
+        OR (e.starts_at IS NOT DISTINCT FROM $8
+            AND (g.round_index, g.court_index, g.id) > ($9, $10::int, $11::uuid)))
+""" + _MATCH_HISTORY_ORDER + "    LIMIT $12 OFFSET $13\n"
+
+# Player names are not needed to count games. Every group player has a player
+# row (NOT NULL foreign key), so leaving out those joins drops no games
+MATCH_HISTORY_COUNT_SQL = "SELECT COUNT(*)" + _MATCH_HISTORY_FROM + _MATCH_HISTORY_WHERE
+
+
+def _encode_history_cursor(row) -> str:
+    """Encode the keyset position of a MATCH_HISTORY_SQL row as an opaque cursor."""
+    game_id, _, _, event_date, round_index, court_index = row[:6]
+    position = [
+        event_date.isoformat() if event_date else None,
+        round_index,
+        court_index,
+        str(game_id),
+    ]
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+
+def _decode_history_cursor(cursor: str) -> list:
+    """Decode a cursor into the ($8, $9, $10, $11) keyset parameters."""
+    try:
+        event_date, round_index, court_index, game_id = json.loads(
+            base64.urlsafe_b64decode(cursor.encode())
+        )
+        keyset = [
+            datetime.fromisoformat(event_date) if event_date else None,
+            int(round_index),
+            int(court_index),
+            UUID(game_id),
+        ]
+    except (ValueError, TypeError):
+        raise BadRequestError("Invalid history cursor") from None
+    # Round and court are bound as int4; a tampered value must not fail at bind
+    if not all(_INT4_MIN <= index <= _INT4_MAX for index in keyset[1:3]):
+        raise BadRequestError("Invalid history cursor")
+    return keyset
+
 
 class RankingService:
     """Service for ranking and history operations."""
@@ -21,42 +152,55 @@ class RankingService:
         self.groups_repo = GroupsRepository(conn)
         self.group_players_repo = GroupPlayersRepository(conn)
 
+    async def _check_group_access(self, user_id: str, group_id: UUID) -> None:
+        """Raise unless the user owns or is a member of the group."""
+        await check_group_access(self.groups_repo, user_id, group_id)
+
     async def get_rankings(self, user_id: str, group_id: UUID) -> List[RankingEntry]:
         """Get rankings for a group."""
         # Verify group ownership or membership
-        group = await self.groups_repo.get_by_id(group_id)
-        if not group:
-            raise NotFoundError("Group", str(group_id))
-        if str(group["owner_user_id"]) != user_id:
-            is_member = await self.group_players_repo.is_member(user_id, group_id)
-            if not is_member:
-                raise ForbiddenError("You don't have access to this group")
-
-        # Get all players sorted by rating
-        players = await self.group_players_repo.list_by_group(group_id)
-
-        rankings = []
-        for idx, p in enumerate(players, 1):
-            win_rate = p.get("win_rate", 0)
-            if win_rate is None and p["games_played"] > 0:
-                win_rate = (p["wins"] + 0.5 * p["ties"]) / p["games_played"]
-            elif win_rate is None:
-                win_rate = 0
-
-            rankings.append(
-                RankingEntry(
-                    rank=idx,
-                    playerId=p["player_id"],
-                    displayName=p["display_name"],
-                    rating=float(p["rating"]),
-                    gamesPlayed=p["games_played"],
-                    wins=p["wins"],
-                    losses=p["losses"],
-                    ties=p["ties"],
-                    winRate=float(win_rate),
-                )
+        await self._check_group_access(user_id, group_id)
+
+        # Cached rankings are stored with the group's version, which moves when a
+        # rating, result, membership or player name changes, so such changes
+        # usually show up at once. A change whose transaction started before
+        # the latest updated_at may not move it and can be served stale for up
+        # to the cache TTL. One entry per group: a new version replaces the old
+        # one rather than leaving it behind in the cache
+        version = await self.group_players_repo.get_version(group_id)
+        cache_key = f"rankings:{group_id}"
+        cached = await rankings_cache.get(cache_key)
+        if cached is not None:
+            cached_version, cached_rankings = cached
+            if cached_version == version:
+                return cached_rankings
+
+        # Get all players sorted by rating, ranked in SQL so tied ratings share a rank
+        players = await self.group_players_repo.list_by_group_ranked(group_id)
+
+        # Rows come straight from list_by_group_ranked with the declared types
+        # (rating and win rate as float8), so the entries are built without
+        # validation, unpacking each row positionally in its column order
+        build = RankingEntry.model_construct
+        rankings = [
+            build(
+                rank=rank,
+                player_id=player_id,
+                display_name=display_name,
+                rating=rating,
+                games_played=games_played,
+                wins=wins,
+                losses=losses,
+                ties=ties,
+                win_rate=win_rate,
             )
+            for (
+                rank, player_id, display_name, rating,
+                games_played, wins, losses, ties, win_rate,
+            ) in players
+        ]
 
+        await rankings_cache.set(cache_key, (version, rankings))
         return rankings
 
     async def get_match_history(
@@ -71,174 +215,105 @@ class RankingService:
         relationship: Optional[str] = "teammate",
         limit: Optional[int] = None,
         offset: Optional[int] = None,
-    ) -> Tuple[List[MatchHistoryEntry], int]:
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[MatchHistoryEntry], Optional[int], Optional[str]]:
         """Get match history for a group with optional pagination.
-        
+
+        Pages are either addressed by offset, or by the cursor returned with the
+        previous page, which seeks straight to the next game instead of skipping
+        `offset` rows. A paged request returns a cursor while more games follow.
+
         Returns:
-            Tuple of (matches, total_count)
+            Tuple of (matches, total_count, next_cursor). The total is not counted
+            for cursor pages.
         """
+        # A cursor already marks where the page starts; an offset on top of it
+        # would silently skip games
+        if cursor is not None and offset is not None:
+            raise BadRequestError("Use either cursor or offset, not both")
+
+        # Decode before touching the database so a bad cursor fails fast
+        keyset = _decode_history_cursor(cursor) if cursor else [None] * 4
+
         # Verify group ownership or membership
-        group = await self.groups_repo.get_by_id(group_id)
-        if not group:
-            raise NotFoundError("Group", str(group_id))
-        if str(group["owner_user_id"]) != user_id:
-            is_member = await self.group_players_repo.is_member(user_id, group_id)
-            if not is_member:
-                raise ForbiddenError("You don't have access to this group")
-
-        # Build query - use stored team ELO from games table
-        query = """
-            SELECT 
-                g.id as game_id,
-                g.event_id,
-                e.name as event_name,
-                e.starts_at as event_date,
-                g.round_index,
-                g.court_index,
-                g.score_team1,
-                g.score_team2,
-                g.result,
-                g.team1_elo,
-                g.team2_elo,
-                p1.display_name as t1p1_name,
-                p2.display_name as t1p2_name,
-                p3.display_name as t2p1_name,
-                p4.display_name as t2p2_name
-            FROM games g
-            JOIN events e ON e.id = g.event_id
-            JOIN group_players gp1 ON gp1.id = g.team1_p1
-            JOIN group_players gp2 ON gp2.id = g.team1_p2
-            JOIN group_players gp3 ON gp3.id = g.team2_p1
-            JOIN group_players gp4 ON gp4.id = g.team2_p2
-            JOIN players p1 ON p1.id = gp1.player_id
-            JOIN players p2 ON p2.id = gp2.player_id
-            JOIN players p3 ON p3.id = gp3.player_id
-            JOIN players p4 ON p4.id = gp4.player_id
-            WHERE e.group_id = $1 AND e.status = 'COMPLETED'
-        """
+        await self._check_group_access(user_id, group_id)
 
-        params = [group_id]
-        param_idx = 2
-
-        if from_date:
-            query += f" AND e.starts_at >= ${param_idx}"
-            params.append(from_date)
-            param_idx += 1
-
-        if to_date:
-            query += f" AND e.starts_at <= ${param_idx}"
-            params.append(to_date)
-            param_idx += 1
-
-        if event_id:
-            query += f" AND e.id = ${param_idx}"
-            params.append(event_id)
-            param_idx += 1
-
-        if player_id:
-            # Filter for games where this player participated
-            # Need to get the group_player_id first
-            gp_row = await self.conn.fetchrow(
-                "SELECT id FROM group_players WHERE group_id = $1 AND player_id = $2",
-                group_id,
-                player_id,
-            )
-            if gp_row:
-                gp_id = gp_row["id"]
-                
-                # Check for secondary player filter
-                if secondary_player_id:
-                     gp_row_sec = await self.conn.fetchrow(
-                        "SELECT id FROM group_players WHERE group_id = $1 AND player_id = $2",
-                        group_id,
-                        secondary_player_id,
-                    )
-                     if gp_row_sec:
-                         gp_id_sec = gp_row_sec["id"]
-                         
-                         if relationship == 'teammate':
-                             # Both on Team 1 OR Both on Team 2
-                             query += f""" AND (
-                                 ( (g.team1_p1 = ${param_idx} OR g.team1_p2 = ${param_idx}) AND (g.team1_p1 = ${param_idx+1} OR g.team1_p2 = ${param_idx+1}) )
-                                 OR
-                                 ( (g.team2_p1 = ${param_idx} OR g.team2_p2 = ${param_idx}) AND (g.team2_p1 = ${param_idx+1} OR g.team2_p2 = ${param_idx+1}) )
-                             )"""
-                         else: # opponent
-                             # One on Team 1 AND One on Team 2
-                             # (P1 on T1 AND P2 on T2) OR (P1 on T2 AND P2 on T1)
-                             query += f""" AND (
-                                 ( (g.team1_p1 = ${param_idx} OR g.team1_p2 = ${param_idx}) AND (g.team2_p1 = ${param_idx+1} OR g.team2_p2 = ${param_idx+1}) )
-                                 OR
-                                 ( (g.team2_p1 = ${param_idx} OR g.team2_p2 = ${param_idx}) AND (g.team1_p1 = ${param_idx+1} OR g.team1_p2 = ${param_idx+1}) )
-                             )"""
-                         
-                         params.append(gp_id)
-                         params.append(gp_id_sec)
-                         param_idx += 2
-                     else:
-                         # Secondary player not found in group, return empty or ignore? 
-                         # Let's ignore secondary filter if player not found, but standard is strict.
-                         # Better to fall back to just primary player to avoid errors, or match nothing.
-                         # Let's match nothing if secondary provided but not found.
-                         query += " AND 1=0" 
-                else:
-                    # Just primary player filter
-                    query += f" AND (g.team1_p1 = ${param_idx} OR g.team1_p2 = ${param_idx} OR g.team2_p1 = ${param_idx} OR g.team2_p2 = ${param_idx})"
-                    params.append(gp_id)
-                    param_idx += 1
-            else:
-                 # Primary player not found
-                 query += " AND 1=0"
-
-        query += " ORDER BY e.starts_at DESC, g.round_index, g.court_index"
-
-        # Get total count for pagination
-        count_query = f"SELECT COUNT(*) as total FROM ({query}) as subquery"
-        count_row = await self.conn.fetchrow(count_query, *params)
-        total = count_row["total"] if count_row else 0
-        
-        # Add pagination if specified
-        if limit is not None:
-            query += f" LIMIT ${param_idx}"
-            params.append(limit)
-            param_idx += 1
-        
-        if offset is not None:
-            query += f" OFFSET ${param_idx}"
-            params.append(offset)
-            param_idx += 1
-
-        rows = await self.conn.fetch(query, *params)
-
-        matches = []
-        for row in rows:
-            # Use stored team ELO from games table
-            team1_elo = float(row["team1_elo"]) if row["team1_elo"] else None
-            team2_elo = float(row["team2_elo"]) if row["team2_elo"] else None
-            
-            matches.append(
-                MatchHistoryEntry(
-                    gameId=row["game_id"],
-                    eventId=row["event_id"],
-                    eventName=row["event_name"],
-                    date=row["event_date"] or datetime.now(),
-                    roundIndex=row["round_index"],
-                    courtIndex=row["court_index"],
-                    team1=[row["t1p1_name"], row["t1p2_name"]],
-                    team2=[row["t2p1_name"], row["t2p2_name"]],
-                    scoreTeam1=float(row["score_team1"]) if row["score_team1"] else None,
-                    scoreTeam2=float(row["score_team2"]) if row["score_team2"] else None,
-                    result=row["result"],
-                    team1Elo=round(team1_elo, 0) if team1_elo else None,
-                    team2Elo=round(team2_elo, 0) if team2_elo else None,
-                )
-            )
+        # Every filter is always bound (NULL when not given), so the query text is
+        # the same for every call shape
+        params = [
+            group_id,
+            from_date,
+            to_date,
+            event_id,
+            player_id,
+            secondary_player_id,
+            relationship == 'teammate',
+        ]
 
-        return matches, total
+        if limit is None and offset is None and cursor is None:
+            # Unpaginated history can span years of games; stream it from a cursor
+            # (cursors need a transaction) rather than buffering every row first.
+            # Without a limit the total is just the number of rows.
+            matches = []
+            add_match = matches.append
+            to_entry = self._to_match_history_entry
+            async with self.conn.transaction():
+                async for row in self.conn.cursor(
+                    MATCH_HISTORY_SQL, *params, prefetch=_HISTORY_PREFETCH
+                ):
+                    add_match(to_entry(row))
+            return matches, len(matches), None
 
+        # Counting means visiting every matching game, so cursor pages skip it
+        total = None
+        if cursor is None:
+            total = await self.conn.fetchval(MATCH_HISTORY_COUNT_SQL, *params)
 
+        # One extra row tells whether another page follows.
+        # LIMIT NULL is no limit and OFFSET NULL is no offset
+        rows = await self.conn.fetch(
+            MATCH_HISTORY_PAGE_SQL,
+            *params,
+            *keyset,
+            limit + 1 if limit is not None else None,
+            offset,
+        )
 
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = _encode_history_cursor(rows[-1])
 
+        to_entry = self._to_match_history_entry
+        matches = [to_entry(row) for row in rows]
 
+        return matches, total, next_cursor
 
+    @staticmethod
+    def _to_match_history_entry(row) -> MatchHistoryEntry:
+        """Convert a MATCH_HISTORY_SQL row to a response entry."""
+        # Unpacked positionally, in MATCH_HISTORY_SQL's column order. Scores and
+        # rounded team ELO come back as float8 (NULL when zero or unset), so the
+        # values pass straight through and are already the right types to skip
+        # validation
+        (
+            game_id, event_id, event_name, event_date, round_index, court_index,
+            score_team1, score_team2, result, team1_elo, team2_elo,
+            t1p1_name, t1p2_name, t2p1_name, t2p2_name,
+        ) = row
 
+        return _build_match_history_entry(
+            game_id=game_id,
+            event_id=event_id,
+            event_name=event_name,
+            date=event_date or datetime.now(),
+            round_index=round_index,
+            court_index=court_index,
+            team1=[t1p1_name, t1p2_name],
+            team2=[t2p1_name, t2p2_name],
+            score_team1=score_team1,
+            score_team2=score_team2,
+            result=result,
+            team1_elo=team1_elo,
+            team2_elo=team2_elo,
+        )
@@ -1,6 +1,7 @@
 from functools import lru_cache
-from typing import List
+from typing import Tuple
 
+from pydantic import PrivateAttr, model_validator
 from pydantic_settings import BaseSettings
 
 
@@ -9,6 +10,11 @@ class Settings(BaseSettings):
 
     # Database
     supabase_db_url: str = ""
+    # Connection pool; defaults suit serverless (few, short-lived connections).
+    # A long-running server can keep a warm pool with a higher min size
+    db_pool_min_size: int = 0
+    db_pool_max_size: int = 5
+    db_pool_max_inactive_lifetime: float = 60.0
 
     # Clerk Auth
     clerk_jwks_url: str = ""
@@ -23,15 +29,27 @@ class Settings(BaseSettings):
     environment: str = "development"
     debug: bool = False
 
+    # Derived once from the fields above, since they are read per request
+    _cors_origins: Tuple[str, ...] = PrivateAttr(default=())
+    _is_production: bool = PrivateAttr(default=False)
+
+    @model_validator(mode="after")
+    def _derive_settings(self) -> "Settings":
+        self._cors_origins = tuple(
+            origin.strip() for origin in self.allowed_origins.split(",") if origin.strip()
+        )
+        self._is_production = self.environment.lower() == "production"
+        return self
+
     @property
-    def cors_origins(self) -> List[str]:
-        """Parse allowed origins into a list."""
-        return [origin.strip() for origin in self.allowed_origins.split(",") if origin.strip()]
+    def cors_origins(self) -> Tuple[str, ...]:
+        """Allowed origins, parsed from the comma separated setting."""
+        return self._cors_origins
 
     @property
     def is_production(self) -> bool:
         """Check if running in production."""
-        return self.environment.lower() == "production"
+        return self._is_production
 
     class Config:
         env_file = ".env"
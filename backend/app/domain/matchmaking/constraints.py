@@ -1,11 +1,20 @@
 """
 Matchmaking constraints for pickleball events.
 """
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Dict, FrozenSet, List, Set, Tuple
 from uuid import UUID
 
 
+def pair_key(a: int, b: int, player_count: int) -> int:
+    """
+    Order-independent key for a pair of player indexes (0 <= index < player_count).
+
+    Keys are dense, below player_count ** 2, so they can index a flat list.
+    """
+    return a * player_count + b if a < b else b * player_count + a
+
+
 @dataclass
 class ConstraintConfig:
     """Configuration for matchmaking constraints."""
@@ -58,6 +67,40 @@ class Game:
         }
 
 
+@dataclass
+class ConstraintState:
+    """
+    Teammate and opponent pair counts of the games scheduled so far, by pair_key.
+
+    Kept up to date as games are added and removed, so checking a candidate
+    game is a few lookups instead of a rescan of the existing games. Counts
+    live in flat lists indexed by the dense pair key rather than dicts.
+    """
+
+    player_count: int
+    teammate_counts: List[int] = field(init=False)
+    opponent_counts: List[int] = field(init=False)
+
+    def __post_init__(self):
+        size = self.player_count * self.player_count
+        self.teammate_counts = [0] * size
+        self.opponent_counts = [0] * size
+
+    def add_game(self, teammate_keys: Tuple[int, ...], opponent_keys: Tuple[int, ...]) -> None:
+        """Count a game's teammate and opponent pairs."""
+        for key in teammate_keys:
+            self.teammate_counts[key] += 1
+        for key in opponent_keys:
+            self.opponent_counts[key] += 1
+
+    def remove_game(self, teammate_keys: Tuple[int, ...], opponent_keys: Tuple[int, ...]) -> None:
+        """Undo add_game for the same pairs."""
+        for key in teammate_keys:
+            self.teammate_counts[key] -= 1
+        for key in opponent_keys:
+            self.opponent_counts[key] -= 1
+
+
 class ConstraintChecker:
     """Validates matchmaking constraints."""
 
@@ -101,15 +144,18 @@ class ConstraintChecker:
                 return False
         return True
 
+    def rating_imbalance(self, team1_rating: float, team2_rating: float) -> float:
+        """Rating difference between two teams, relative to the higher rating."""
+        max_rating = max(team1_rating, team2_rating)
+        if max_rating == 0:
+            return 0.0
+        return abs(team1_rating - team2_rating) / max_rating
+
     def check_rating_balance(
         self, team1_rating: float, team2_rating: float, elo_diff: float
     ) -> bool:
         """Check if two teams are balanced within the rating difference threshold."""
-        max_rating = max(team1_rating, team2_rating)
-        if max_rating == 0:
-            return True
-        diff = abs(team1_rating - team2_rating) / max_rating
-        return diff <= elo_diff
+        return self.rating_imbalance(team1_rating, team2_rating) <= elo_diff
 
     def validate_game(
         self,
@@ -125,37 +171,44 @@ class ConstraintChecker:
             Tuple of (is_valid, list of violation messages)
         """
         violations = []
-
-        # Get existing pairs from this event
-        existing_teammates = set()
-        opponent_counts: Dict[FrozenSet[UUID], int] = {}
-        for g in existing_games:
-            existing_teammates.update(g.teammate_pairs())
-            for pair in g.opponent_pairs():
-                opponent_counts[pair] = opponent_counts.get(pair, 0) + 1
+        config = self.config
+
+        # Tally, for just this game's two teammate pairs and four opponent pairs,
+        # how often each already occurred in the event. Membership tests on the
+        # existing games' team tuples avoid building pair sets for every game
+        teams = (game.team1, game.team2)
+        opponents = [(p, q) for p in game.team1 for q in game.team2]
+        teammate_repeats = [False, False]
+        opponent_counts = [0, 0, 0, 0]
+        if config.no_repeat_teammate_in_event or config.no_repeat_opponent_in_event:
+            for g in existing_games:
+                g_team1, g_team2 = g.team1, g.team2
+                for i, (a, b) in enumerate(teams):
+                    if (a in g_team1 and b in g_team1) or (a in g_team2 and b in g_team2):
+                        teammate_repeats[i] = True
+                for i, (p, q) in enumerate(opponents):
+                    if (p in g_team1 and q in g_team2) or (p in g_team2 and q in g_team1):
+                        opponent_counts[i] += 1
 
         # Check teammate constraints
-        for pair in game.teammate_pairs():
-            if not self.check_teammate_constraint_in_event(pair, existing_teammates):
+        for i, team in enumerate(teams):
+            if config.no_repeat_teammate_in_event and teammate_repeats[i]:
                 violations.append(f"Repeated teammate pair in event")
-            if not self.check_teammate_constraint_from_previous(pair):
+            if not self.check_teammate_constraint_from_previous(frozenset(team)):
                 violations.append(f"Repeated teammate pair from previous event")
 
         # Check opponent constraint (max 2 matches against same opponent)
-        if not self.check_opponent_constraint(game.opponent_pairs(), opponent_counts):
+        if config.no_repeat_opponent_in_event and max(opponent_counts) >= 2:
             violations.append(f"Opponent pair would exceed 2 matches in event")
 
-        # Check rating balance
-        team1_rating = (
-            players[game.team1[0]].rating + players[game.team1[1]].rating
-        ) / 2
-        team2_rating = (
-            players[game.team2[0]].rating + players[game.team2[1]].rating
-        ) / 2
+        # Check rating balance; the check is a ratio, so team sums compare the
+        # same as averages, which are only needed for the message
+        team1_sum = players[game.team1[0]].rating + players[game.team1[1]].rating
+        team2_sum = players[game.team2[0]].rating + players[game.team2[1]].rating
 
-        if not self.check_rating_balance(team1_rating, team2_rating, elo_diff):
+        if not self.check_rating_balance(team1_sum, team2_sum, elo_diff):
             violations.append(
-                f"Rating imbalance: {team1_rating:.0f} vs {team2_rating:.0f}"
+                f"Rating imbalance: {team1_sum / 2:.0f} vs {team2_sum / 2:.0f}"
             )
 
         return len(violations) == 0, violations
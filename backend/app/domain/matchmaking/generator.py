@@ -11,10 +11,16 @@ from uuid import UUID
 from app.domain.matchmaking.constraints import (
     ConstraintChecker,
     ConstraintConfig,
+    ConstraintState,
     Game,
     Player,
+    pair_key,
 )
 
+# A match as round selection sees it: the two teams, the match's players as a
+# bitmask of player indexes, and its teammate and opponent pair keys
+_Candidate = Tuple[Tuple[UUID, UUID], Tuple[UUID, UUID], int, Tuple[int, int], Tuple[int, int, int, int]]
+
 
 @dataclass
 class GenerationResult:
@@ -54,6 +60,20 @@ class ScheduleGenerator:
         self.checker = ConstraintChecker(config, previous_teammate_pairs)
         self.seed = seed or self._generate_seed()
 
+        # Players are numbered once per event, and constraint tracking keys pairs
+        # by pair_key of those numbers instead of frozensets of UUIDs
+        self._index = {pid: i for i, pid in enumerate(self.player_ids)}
+        n = len(self.player_ids)
+        # Flags by pair key, like ConstraintState's counts
+        self._previous_teammate_keys = bytearray(n * n)
+        for pair in previous_teammate_pairs or ():
+            if len(pair) == 2 and all(pid in self._index for pid in pair):
+                a, b = pair
+                self._previous_teammate_keys[pair_key(self._index[a], self._index[b], n)] = 1
+        self._violates_hard_constraints = self._hard_constraint_check()
+        # Smallest rating imbalance of any match, found by the first enumeration
+        self._min_imbalance: Optional[float] = None
+
     def _generate_seed(self) -> str:
         """Generate a random seed."""
         return hashlib.sha256(str(time.time()).encode()).hexdigest()[:12]
@@ -163,34 +183,31 @@ class ScheduleGenerator:
             failure_reason is 'rating' if failure was due to rating constraints,
             'hard_constraints' if due to hard constraints, or None if successful
         """
+        # Balance is a threshold on each match's imbalance, so once the matches
+        # have been enumerated, an elo_diff below the smallest imbalance is known
+        # to leave none; relaxation steps up to it skip the enumeration
+        if self._min_imbalance is not None and elo_diff < self._min_imbalance:
+            return [], False, 'rating'
+
         # Generate all valid matches filtered by ELO
         valid_matches = self._generate_all_valid_matches(elo_diff)
         
         if not valid_matches:
             return [], False, 'rating'
         
+        # Players and pair keys of every match, derived once for all rounds
+        candidates = self._match_candidates(valid_matches)
+
         all_games: List[Game] = []
-        event_teammate_pairs: Set[FrozenSet[UUID]] = set()
-        event_opponent_counts: Dict[FrozenSet[UUID], int] = {}
+        # Pairs of every game selected so far; each round adds its games to it
+        state = ConstraintState(len(self.player_ids))
 
         for round_idx in range(self.rounds):
-            round_games = self._select_round_matches(
-                round_idx,
-                valid_matches,
-                event_teammate_pairs,
-                event_opponent_counts,
-            )
+            round_games = self._select_round_matches(round_idx, candidates, state)
 
             if round_games is None:
                 return [], False, 'hard_constraints'
 
-            # Update tracking sets
-            for game in round_games:
-                event_teammate_pairs.update(game.teammate_pairs())
-                # Update opponent match counts
-                for pair in game.opponent_pairs():
-                    event_opponent_counts[pair] = event_opponent_counts.get(pair, 0) + 1
-
             all_games.extend(round_games)
 
         return all_games, True, None
@@ -210,97 +227,140 @@ class ScheduleGenerator:
         # Generate all team pairs (2-player combinations)
         player_list = list(self.players.values())
         pairs = list(combinations(player_list, 2))
-        
-        # Generate all matches (team1 vs team2 with no player overlap)
-        matches = []
-        for team1 in pairs:
-            for team2 in pairs:
-                # No player overlap
-                if {team1[0].id, team1[1].id} & {team2[0].id, team2[1].id}:
+
+        # Each team's ids, players as a bitmask and rating sum, computed once
+        # per pair instead of once per match. The balance check is a ratio of
+        # the two teams' ratings, so comparing sums gives the same result as
+        # comparing averages
+        teams = [(p1.id, p2.id) for p1, p2 in pairs]
+        team_bits = [(1 << i) | (1 << j) for i, j in combinations(range(len(player_list)), 2)]
+        team_sums = [p1.rating + p2.rating for p1, p2 in pairs]
+        rating_imbalance = self.checker.rating_imbalance
+        min_imbalance = float("inf")
+
+        # Opponent teams for each team: no player overlap and ELO balanced, as
+        # checker.check_rating_balance tests it. Both tests are symmetric, so each unordered pair of teams is tested once
+        # and recorded for both. Team indexes are visited in ascending order,
+        # so every list comes out sorted
+        opponents: List[List[int]] = [[] for _ in teams]
+        for t1 in range(len(teams)):
+            bits1, sum1, opponents1 = team_bits[t1], team_sums[t1], opponents[t1]
+            for t2 in range(t1 + 1, len(teams)):
+                if bits1 & team_bits[t2]:
                     continue
-                
-                # Check ELO balance
-                team1_rating = (team1[0].rating + team1[1].rating) / 2
-                team2_rating = (team2[0].rating + team2[1].rating) / 2
-                
-                if self.checker.check_rating_balance(team1_rating, team2_rating, elo_diff):
-                    matches.append((
-                        (team1[0].id, team1[1].id),
-                        (team2[0].id, team2[1].id)
-                    ))
+                imbalance = rating_imbalance(sum1, team_sums[t2])
+                if imbalance < min_imbalance:
+                    min_imbalance = imbalance
+                if imbalance <= elo_diff:
+                    opponents1.append(t2)
+                    opponents[t2].append(t1)
+        self._min_imbalance = min_imbalance
+
+        # Generate all matches (team1 vs team2), in the order of the full
+        # team1 x team2 scan. Round selection draws from this list, so a seed
+        # reproduces a schedule only while this order and the draw logic stay
+        # the same: seeded output is stable within one version, not across
+        matches = [
+            (teams[t1], teams[t2])
+            for t1, opponents1 in enumerate(opponents)
+            for t2 in opponents1
+        ]
         
         return matches
 
+    def _match_candidates(
+        self,
+        valid_matches: List[Tuple[Tuple[UUID, UUID], Tuple[UUID, UUID]]],
+    ) -> List[_Candidate]:
+        """Derive each match's player bitmask and pair keys for round selection."""
+        index = self._index
+        n = len(index)
+        candidates = []
+        for team1, team2 in valid_matches:
+            a, b = index[team1[0]], index[team1[1]]
+            c, d = index[team2[0]], index[team2[1]]
+            candidates.append((
+                team1,
+                team2,
+                (1 << a) | (1 << b) | (1 << c) | (1 << d),
+                (pair_key(a, b, n), pair_key(c, d, n)),
+                (pair_key(a, c, n), pair_key(a, d, n), pair_key(b, c, n), pair_key(b, d, n)),
+            ))
+        return candidates
+
     def _select_round_matches(
         self,
         round_idx: int,
-        valid_matches: List[Tuple[Tuple[UUID, UUID], Tuple[UUID, UUID]]],
-        event_teammate_pairs: Set[FrozenSet[UUID]],
-        event_opponent_counts: Dict[FrozenSet[UUID], int],
+        candidates: List[_Candidate],
+        state: ConstraintState,
     ) -> Optional[List[Game]]:
         """
         Select non-overlapping matches for one round from the candidate pool.
         
         Args:
             round_idx: The round number
-            valid_matches: Pre-computed valid matches (ELO-filtered)
-            event_teammate_pairs: Teammate pairs already used in this event
-            event_opponent_counts: Opponent pair counts for this event
+            candidates: Pre-computed valid matches (ELO-filtered), from
+                _match_candidates
+            state: Pairs of the games selected so far in this event; the
+                selected round's games are added to it
         
         Returns:
             List of games for this round, or None if cannot fill all courts
         """
+        violates = self._violates_hard_constraints
+        randrange = random.randrange
+
+        # One working copy of the pool per round. Each attempt draws from it in
+        # a fresh random order with a Fisher-Yates shuffle done lazily, a swap
+        # per candidate drawn, so an attempt that fills the courts early stops
+        # shuffling too. Reshuffling the previous attempt's order in place is
+        # just as uniform as shuffling a fresh copy
+        pool = candidates.copy()
+        size = len(pool)
+
         # Try multiple times with different shuffles
         for _ in range(self.MAX_ROUND_ATTEMPTS):
-            # Shuffle to get variety
-            shuffled_matches = valid_matches.copy()
-            random.shuffle(shuffled_matches)
-            
             selected: List[Game] = []
-            used_players: Set[UUID] = set()
-            round_teammate_pairs: Set[FrozenSet[UUID]] = set()
-            round_opponent_counts: Dict[FrozenSet[UUID], int] = {}
+            selected_keys = []
+            # The round's players as a bitmask, so the overlap test is an AND
+            used_players = 0
             
-            for match in shuffled_matches:
-                team1, team2 = match
-                match_players = set(team1) | set(team2)
-                
+            for i in range(size):
+                # Draw the next candidate from the not yet drawn rest
+                j = randrange(i, size)
+                candidate = pool[j]
+                pool[j] = pool[i]
+                pool[i] = candidate
+                team1, team2, match_players, teammate_keys, opponent_keys = candidate
+
                 # Skip if any player already used this round
                 if match_players & used_players:
                     continue
                 
-                # Create game object
-                game = Game(
+                # Check hard constraints against the event so far, including
+                # this round's games already selected
+                if violates(teammate_keys, opponent_keys, state):
+                    continue
+                
+                # Add match
+                selected.append(Game(
                     round_index=round_idx,
                     court_index=len(selected),
                     team1=team1,
                     team2=team2,
-                )
-                
-                # Merge event and round tracking for constraint checking
-                combined_teammate_pairs = event_teammate_pairs | round_teammate_pairs
-                combined_opponent_counts = {**event_opponent_counts}
-                for pair, count in round_opponent_counts.items():
-                    combined_opponent_counts[pair] = combined_opponent_counts.get(pair, 0) + count
-                
-                # Check hard constraints
-                if not self._check_hard_constraints(
-                    game, combined_teammate_pairs, combined_opponent_counts
-                ):
-                    continue
-                
-                # Add match
-                selected.append(game)
-                used_players.update(match_players)
-                round_teammate_pairs.update(game.teammate_pairs())
-                for pair in game.opponent_pairs():
-                    round_opponent_counts[pair] = round_opponent_counts.get(pair, 0) + 1
+                ))
+                selected_keys.append((teammate_keys, opponent_keys))
+                used_players |= match_players
+                state.add_game(teammate_keys, opponent_keys)
                 
                 # Check if we have enough games for all courts
                 if len(selected) == self.courts:
                     return selected
             
-            # If we got close but not enough, try again with different shuffle
+            # If we got close but not enough, undo this attempt's games and try
+            # again with a different shuffle
+            for teammate_keys, opponent_keys in selected_keys:
+                state.remove_game(teammate_keys, opponent_keys)
         
         return None  # Couldn't fill all courts after max attempts
 
@@ -310,8 +370,7 @@ class ScheduleGenerator:
         court_idx: int,
         players: List[UUID],
         existing_games: List[Game],
-        event_teammate_pairs: Set[FrozenSet[UUID]],
-        opponent_counts: Dict[FrozenSet[UUID], int],
+        state: ConstraintState,
         elo_diff: float,
     ) -> Optional[Game]:
         """
@@ -319,8 +378,7 @@ class ScheduleGenerator:
         There are 3 possible team pairings.
         """
         result, _ = self._find_best_game_with_reason(
-            round_idx, court_idx, players, existing_games,
-            event_teammate_pairs, opponent_counts, elo_diff
+            round_idx, court_idx, players, existing_games, state, elo_diff
         )
         return result
 
@@ -330,8 +388,7 @@ class ScheduleGenerator:
         court_idx: int,
         players: List[UUID],
         existing_games: List[Game],
-        event_teammate_pairs: Set[FrozenSet[UUID]],
-        opponent_counts: Dict[FrozenSet[UUID], int],
+        state: ConstraintState,
         elo_diff: float,
     ) -> Tuple[Optional[Game], Optional[str]]:
         """
@@ -366,9 +423,7 @@ class ScheduleGenerator:
             )
 
             # Check hard constraints
-            if not self._check_hard_constraints(
-                game, event_teammate_pairs, opponent_counts
-            ):
+            if not self._check_hard_constraints(game, state):
                 had_hard_constraint_violations = True
                 continue
 
@@ -402,33 +457,64 @@ class ScheduleGenerator:
 
         return best_game, None
 
-    def _check_hard_constraints(
-        self,
-        game: Game,
-        event_teammate_pairs: Set[FrozenSet[UUID]],
-        opponent_counts: Dict[FrozenSet[UUID], int],
-    ) -> bool:
-        """Check hard constraints (teammate/opponent rules)."""
-        # Check teammate constraints
-        for pair in game.teammate_pairs():
-            if not self.checker.check_teammate_constraint_in_event(
-                pair, event_teammate_pairs
-            ):
-                return False
-            if not self.checker.check_teammate_constraint_from_previous(pair):
-                return False
-
-        # Check opponent constraint (max 2 matches against same opponent)
-        if not self.checker.check_opponent_constraint(
-            game.opponent_pairs(), opponent_counts
-        ):
-            return False
-
-        return True
-
-
-
-
+    def _teammate_keys(self, game: Game) -> Tuple[int, int]:
+        """Pair keys of a game's two teams."""
+        index = self._index
+        n = len(index)
+        (a, b), (c, d) = game.team1, game.team2
+        return pair_key(index[a], index[b], n), pair_key(index[c], index[d], n)
+
+    def _opponent_keys(self, game: Game) -> Tuple[int, int, int, int]:
+        """Pair keys of a game's four opponent pairs."""
+        index = self._index
+        n = len(index)
+        a, b = index[game.team1[0]], index[game.team1[1]]
+        c, d = index[game.team2[0]], index[game.team2[1]]
+        return pair_key(a, c, n), pair_key(a, d, n), pair_key(b, c, n), pair_key(b, d, n)
+
+    def _check_hard_constraints(self, game: Game, state: ConstraintState) -> bool:
+        """Check hard constraints (teammate/opponent rules) on pair keys."""
+        return not self._violates_hard_constraints(
+            self._teammate_keys(game), self._opponent_keys(game), state
+        )
 
+    def _hard_constraint_check(self):
+        """
+        Build the predicate round selection checks each candidate with: whether
+        a game with these pair keys breaks an enabled hard constraint, i.e. a
+        teammate pair repeated in the event or from the previous event, or an
+        opponent pair meeting a third time.
 
+        The config is fixed for a run, so its flags are read once here and
+        disabled rules are left out of the predicate entirely.
+        """
+        config = self.config
+        check_teammates = config.no_repeat_teammate_in_event
+        check_previous = config.no_repeat_teammate_from_previous_event
+        check_opponents = config.no_repeat_opponent_in_event
+        previous = self._previous_teammate_keys
+
+        def violates(
+            teammate_keys: Tuple[int, int],
+            opponent_keys: Tuple[int, int, int, int],
+            state: ConstraintState,
+        ) -> bool:
+            t1, t2 = teammate_keys
+            if check_teammates:
+                teammate_counts = state.teammate_counts
+                if teammate_counts[t1] or teammate_counts[t2]:
+                    return True
+            if check_previous and (previous[t1] or previous[t2]):
+                return True
+            if check_opponents:
+                opponent_counts = state.opponent_counts
+                o1, o2, o3, o4 = opponent_keys
+                return (
+                    opponent_counts[o1] >= 2 or opponent_counts[o2] >= 2
+                    or opponent_counts[o3] >= 2 or opponent_counts[o4] >= 2
+                )
+            return False
 
+        if not (check_teammates or check_previous or check_opponents):
+            return lambda teammate_keys, opponent_keys, state: False
+        return violates
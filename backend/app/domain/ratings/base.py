@@ -48,6 +48,16 @@ class RatingDelta:
     display_name: str = ""
 
 
+# Flat per-game tuple used by the hot rating paths:
+# (t1p1, t1p2, t2p1, t2p2, t1p1_rating, t1p2_rating, t2p1_rating, t2p2_rating,
+#  result, score_team1, score_team2)
+RawGame = Tuple[
+    UUID, UUID, UUID, UUID,
+    float, float, float, float,
+    GameResult, Optional[float], Optional[float],
+]
+
+
 class RatingSystem(ABC):
     """Abstract base class for rating systems."""
 
@@ -56,6 +66,21 @@ class RatingSystem(ABC):
         self.elo_const = elo_const
 
     @abstractmethod
+    def calculate_deltas_raw(
+        self, games: List[RawGame], current_ratings: Dict[UUID, float]
+    ) -> Dict[UUID, float]:
+        """
+        Calculate cumulative rating deltas from flat game tuples.
+
+        Args:
+            games: List of RawGame tuples to process
+            current_ratings: Current ratings for all players
+
+        Returns:
+            Dict mapping player ID to their total delta
+        """
+        pass
+
     def calculate_deltas(
         self, games: List[GameForRating], current_ratings: Dict[UUID, float]
     ) -> Dict[UUID, RatingDelta]:
@@ -69,7 +94,59 @@ class RatingSystem(ABC):
         Returns:
             Dict mapping player ID to their rating delta
         """
-        pass
+        player_info: Dict[UUID, PlayerRating] = {}
+        raw_games: List[RawGame] = []
+        for game in games:
+            p1, p2 = game.team1
+            p3, p4 = game.team2
+            for p in (p1, p2, p3, p4):
+                if p.player_id not in player_info:
+                    player_info[p.player_id] = p
+            raw_games.append((
+                p1.player_id, p2.player_id, p3.player_id, p4.player_id,
+                p1.rating, p2.rating, p3.rating, p4.rating,
+                game.result, game.score_team1, game.score_team2,
+            ))
+
+        result: Dict[UUID, RatingDelta] = {}
+        for player_id, delta in self.calculate_deltas_raw(raw_games, current_ratings).items():
+            info = player_info[player_id]
+            rating_before = current_ratings.get(player_id, info.rating)
+            result[player_id] = RatingDelta(
+                player_id=player_id,
+                rating_before=rating_before,
+                rating_after=rating_before + delta,
+                delta=delta,
+                display_name=info.display_name,
+            )
+        return result
+
+    def apply_deltas(
+        self, games: List[GameForRating], current_ratings: Dict[UUID, float]
+    ) -> Dict[UUID, RatingDelta]:
+        """
+        Calculate deltas for a batch of simultaneous games (e.g. one round)
+        and write the new ratings into current_ratings in place.
+
+        Returns the deltas for callers that also need to record history.
+        """
+        deltas = self.calculate_deltas(games, current_ratings)
+        for player_id, delta in deltas.items():
+            current_ratings[player_id] = delta.rating_after
+        return deltas
+
+    def apply_deltas_raw(
+        self, games: List[RawGame], current_ratings: Dict[UUID, float]
+    ) -> Dict[UUID, float]:
+        """
+        Tuple-based counterpart of apply_deltas for the replay loops.
+
+        Every player in games must already have an entry in current_ratings.
+        """
+        deltas = self.calculate_deltas_raw(games, current_ratings)
+        for player_id, delta in deltas.items():
+            current_ratings[player_id] += delta
+        return deltas
 
     def _get_team_average(self, p1: PlayerRating, p2: PlayerRating) -> float:
         """Get the average rating of a team."""
@@ -90,10 +167,3 @@ class RatingSystem(ABC):
             return 1.0 if is_team1 else 0.0
         else:  # TEAM2_WIN
             return 0.0 if is_team1 else 1.0
-
-
-
-
-
-
-
@@ -2,16 +2,10 @@
 Catch-Up ELO rating system.
 A fun mode that compresses rating spread over time.
 """
-from typing import Dict, List
+from typing import Dict, List, Tuple
 from uuid import UUID
 
-from app.domain.ratings.base import (
-    GameForRating,
-    GameResult,
-    PlayerRating,
-    RatingDelta,
-    RatingSystem,
-)
+from app.domain.ratings.base import GameResult, RatingSystem, RawGame
 
 
 class CatchUpEloRating(RatingSystem):
@@ -32,28 +26,25 @@ class CatchUpEloRating(RatingSystem):
         self.gain_reduction_max = 0.30  # Max reduction for above-median winners
         self.loss_penalty_max = 0.20  # Max extra loss for above-median losers
 
-    def calculate_deltas(
-        self, games: List[GameForRating], current_ratings: Dict[UUID, float]
-    ) -> Dict[UUID, RatingDelta]:
+    def calculate_deltas_raw(
+        self, games: List[RawGame], current_ratings: Dict[UUID, float]
+    ) -> Dict[UUID, float]:
         """Calculate rating deltas with catch-up adjustments."""
         # Track cumulative deltas for each player
         player_deltas: Dict[UUID, float] = {}
-        player_info: Dict[UUID, PlayerRating] = {}
+        seat_ratings: Dict[UUID, float] = {}
 
         # First pass: collect all players and their ratings
-        all_players = set()
         for game in games:
-            for p in [*game.team1, *game.team2]:
-                all_players.add(p.player_id)
-                if p.player_id not in player_info:
-                    player_info[p.player_id] = p
-                    player_deltas[p.player_id] = 0.0
+            for player_id, rating in zip(game[0:4], game[4:8]):
+                if player_id not in player_deltas:
+                    player_deltas[player_id] = 0.0
+                    seat_ratings[player_id] = rating
 
         # Calculate median rating
-        ratings = [
-            current_ratings.get(pid, player_info[pid].rating) for pid in all_players
-        ]
-        sorted_ratings = sorted(ratings)
+        sorted_ratings = sorted(
+            current_ratings.get(pid, rating) for pid, rating in seat_ratings.items()
+        )
         n = len(sorted_ratings)
         if n == 0:
             median_rating = 1000.0
@@ -62,53 +53,43 @@ class CatchUpEloRating(RatingSystem):
         else:
             median_rating = sorted_ratings[n // 2]
 
+        # The catch-up multipliers only depend on a player's rating (the median
+        # is fixed for the event), so they are worked out once per rating
+        # rather than once per seat
+        factors: Dict[float, Tuple[float, float]] = {}
+        delta_factors = self._delta_factors
+        k_factor = self.k_factor
+
         # Process each game
-        for game in games:
-            if game.result == GameResult.UNSET:
+        for p1, p2, p3, p4, r1, r2, r3, r4, result, _, _ in games:
+            if result == GameResult.UNSET:
                 continue
 
             # Calculate base ELO delta (same as serious ELO)
-            team1_rating = self._get_team_average(game.team1[0], game.team1[1])
-            team2_rating = self._get_team_average(game.team2[0], game.team2[1])
-
-            expected_team1 = self._get_expected_score(team1_rating, team2_rating)
-            actual_team1 = self._get_actual_score(game.result, is_team1=True)
-
-            base_delta_team1 = self.k_factor * (actual_team1 - expected_team1)
+            expected_team1 = self._get_expected_score((r1 + r2) / 2, (r3 + r4) / 2)
+            actual_team1 = self._get_actual_score(result, is_team1=True)
+            base_delta_team1 = k_factor * (actual_team1 - expected_team1)
+            base_delta_team2 = -base_delta_team1
 
             # Apply catch-up adjustments per player
-            for p in game.team1:
-                adjusted_delta = self._adjust_delta(
-                    base_delta_team1,
-                    current_ratings.get(p.player_id, p.rating),
-                    median_rating,
+            for player_id, rating, base_delta in (
+                (p1, r1, base_delta_team1),
+                (p2, r2, base_delta_team1),
+                (p3, r3, base_delta_team2),
+                (p4, r4, base_delta_team2),
+            ):
+                player_rating = current_ratings.get(player_id, rating)
+                player_factors = factors.get(player_rating)
+                if player_factors is None:
+                    player_factors = factors[player_rating] = delta_factors(
+                        player_rating, median_rating
+                    )
+                gain_factor, loss_factor = player_factors
+                player_deltas[player_id] += base_delta * (
+                    gain_factor if base_delta > 0 else loss_factor
                 )
-                player_deltas[p.player_id] += adjusted_delta
-
-            for p in game.team2:
-                base_delta = -base_delta_team1
-                adjusted_delta = self._adjust_delta(
-                    base_delta,
-                    current_ratings.get(p.player_id, p.rating),
-                    median_rating,
-                )
-                player_deltas[p.player_id] += adjusted_delta
-
-        # Build result
-        result: Dict[UUID, RatingDelta] = {}
-        for player_id, delta in player_deltas.items():
-            rating_before = current_ratings.get(
-                player_id, player_info[player_id].rating
-            )
-            result[player_id] = RatingDelta(
-                player_id=player_id,
-                rating_before=rating_before,
-                rating_after=rating_before + delta,
-                delta=delta,
-                display_name=player_info[player_id].display_name,
-            )
-
-        return result
+
+        return player_deltas
 
     def _adjust_delta(
         self, base_delta: float, player_rating: float, median_rating: float
@@ -119,34 +100,28 @@ class CatchUpEloRating(RatingSystem):
         Below median: boost gains, normal losses
         Above median: reduce gains, harsher losses
         """
+        gain_factor, loss_factor = self._delta_factors(player_rating, median_rating)
+        return base_delta * (gain_factor if base_delta > 0 else loss_factor)
+
+    def _delta_factors(
+        self, player_rating: float, median_rating: float
+    ) -> Tuple[float, float]:
+        """Multipliers applied to a gain and to a loss for a player's rating."""
         if median_rating == 0:
-            return base_delta
+            return 1.0, 1.0
 
         # Calculate how far from median (as a ratio)
         distance_ratio = (player_rating - median_rating) / median_rating
         distance_ratio = max(-0.5, min(0.5, distance_ratio))  # Clamp to reasonable range
 
-        if base_delta > 0:  # This is a gain
-            if player_rating < median_rating:
-                # Below median: boost gains
-                boost = self.gain_boost_max * abs(distance_ratio) * 2
-                return base_delta * (1 + boost)
-            else:
-                # Above median: reduce gains
-                reduction = self.gain_reduction_max * abs(distance_ratio) * 2
-                return base_delta * (1 - reduction)
-        else:  # This is a loss
-            if player_rating > median_rating:
-                # Above median: harsher losses
-                penalty = self.loss_penalty_max * abs(distance_ratio) * 2
-                return base_delta * (1 + penalty)
-            else:
-                # Below median: normal losses
-                return base_delta
-
-
-
-
-
-
-
+        if player_rating < median_rating:
+            # Below median: boost gains, normal losses
+            boost = self.gain_boost_max * abs(distance_ratio) * 2
+            return 1 + boost, 1.0
+        if player_rating > median_rating:
+            # Above median: reduce gains, harsher losses
+            reduction = self.gain_reduction_max * abs(distance_ratio) * 2
+            penalty = self.loss_penalty_max * abs(distance_ratio) * 2
+            return 1 - reduction, 1 + penalty
+        # At the median: gains are reduced by nothing, losses are normal
+        return 1.0, 1.0
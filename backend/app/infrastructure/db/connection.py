@@ -1,8 +1,9 @@
 import socket
-from typing import Optional
+from typing import Any, Optional
 from urllib.parse import urlparse
 
 import asyncpg
+import orjson
 
 from app.config import get_settings
 from app.logging_config import get_logger
@@ -35,6 +36,34 @@ def resolve_host_to_ipv4(db_url: str) -> str:
     return db_url
 
 
+# Binary JSONB wire format is a version byte (always 1) followed by the JSON text
+_JSONB_VERSION = b"\x01"
+
+
+def _encode_jsonb(value: Any) -> bytes:
+    return _JSONB_VERSION + orjson.dumps(value)
+
+
+def _decode_jsonb(data: bytes) -> Any:
+    # orjson reads memoryviews directly, so skipping the version byte costs no copy
+    return orjson.loads(memoryview(data)[1:])
+
+
+async def _init_connection(conn: asyncpg.Connection) -> None:
+    """Per-connection setup: decode/encode JSONB columns as Python objects."""
+    await conn.set_type_codec(
+        "jsonb",
+        encoder=_encode_jsonb,
+        decoder=_decode_jsonb,
+        schema="pg_catalog",
+        format="binary",
+    )
+    # uuid keeps asyncpg's default binary codec. Repositories bind, compare and
+    # return ids as uuid.UUID throughout, so a bytes codec would leak into every
+    # caller, and the match history query decodes only two ids per row (the
+    # player ids it filters on are never selected)
+
+
 async def init_db_pool() -> asyncpg.Pool:
     """Initialize the database connection pool."""
     global _pool
@@ -55,22 +84,30 @@ async def init_db_pool() -> asyncpg.Pool:
 
     try:
         # Note: statement_cache_size=0 is required for Supabase/pgbouncer
-        # because pgbouncer in transaction mode doesn't support prepared statements
-        # Connection pool settings optimized for serverless:
+        # because pgbouncer in transaction mode doesn't support prepared statements.
+        # For the same reason repositories must not use conn.prepare() at all: a
+        # prepared statement belongs to the server session, not the transaction,
+        # so it outlives the commit on a server connection that pgbouncer then
+        # hands to other clients, where its name can clash.
+        # Connection pool settings default to values optimized for serverless:
         # - min_size=0: Allow pool to shrink to 0 when idle
         # - max_size=5: Reduced to prevent connection exhaustion in serverless
         # - max_inactive_connection_lifetime: Clean up idle connections faster
+        # A long-running deployment can raise them via DB_POOL_* settings so
+        # requests reuse warm connections instead of reconnecting
         _pool = await asyncpg.create_pool(
             db_url,
-            min_size=0,
-            max_size=5,
+            min_size=settings.db_pool_min_size,
+            max_size=settings.db_pool_max_size,
             command_timeout=30,
             # For serverless, we want shorter connection timeouts
             timeout=10,
             # Disable prepared statement caching for pgbouncer compatibility
             statement_cache_size=0,
-            # Clean up idle connections after 60 seconds
-            max_inactive_connection_lifetime=60,
+            # Clean up idle connections (after 60 seconds by default)
+            max_inactive_connection_lifetime=settings.db_pool_max_inactive_lifetime,
+            # JSONB columns round-trip as dicts, so repositories pass dicts directly
+            init=_init_connection,
         )
         logger.info("Database connection pool initialized")
     except Exception as e:
@@ -1,4 +1,3 @@
-import json
 from typing import Any, Dict, Optional
 from uuid import UUID
 
@@ -29,7 +28,7 @@ class AuditRepository:
             action,
             group_id,
             event_id,
-            json.dumps(payload) if payload else None,
+            payload or None,
         )
 
 
@@ -1,4 +1,3 @@
-import json
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 from uuid import UUID
@@ -144,7 +143,7 @@ class EventsRepository:
                 """,
                 event_id,
                 status,
-                json.dumps(generation_meta),
+                generation_meta,
             )
         else:
             await self.conn.execute(
@@ -188,11 +187,8 @@ class EventsRepository:
         if row is None:
             return None
 
-        data = dict(row)
-        if "generation_meta" in data and data["generation_meta"]:
-            if isinstance(data["generation_meta"], str):
-                data["generation_meta"] = json.loads(data["generation_meta"])
-        return data
+        # generation_meta (JSONB) is decoded by the pool's connection codec
+        return dict(row)
 
 
 
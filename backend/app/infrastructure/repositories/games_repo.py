@@ -3,6 +3,14 @@ from uuid import UUID
 
 from asyncpg import Connection
 
+# Bulk team ELO update from parallel (game id, team1 ELO, team2 ELO) arrays
+SET_TEAM_ELOS_SQL = """
+    UPDATE games g
+    SET team1_elo = u.team1_elo, team2_elo = u.team2_elo
+    FROM unnest($1::uuid[], $2::numeric[], $3::numeric[]) AS u(id, team1_elo, team2_elo)
+    WHERE g.id = u.id
+"""
+
 
 class GamesRepository:
     """Repository for game operations."""
@@ -162,6 +170,14 @@ class GamesRepository:
         )
         return dict(row) if row else None
 
+    async def set_team_elos(
+        self, game_ids: List[UUID], team1_elos: List[float], team2_elos: List[float]
+    ) -> None:
+        """Set the pre-game team ELOs for many games in one statement (parallel lists)."""
+        if not game_ids:
+            return
+        await self.conn.execute(SET_TEAM_ELOS_SQL, game_ids, team1_elos, team2_elos)
+
     async def swap_players(
         self, game_id: UUID, position1: str, position2: str, player1_id: UUID, player2_id: UUID
     ) -> None:
@@ -185,25 +201,39 @@ class GamesRepository:
             event_id,
         )
 
-    async def get_teammate_pairs_from_event(self, event_id: UUID) -> List[tuple]:
-        """Get all teammate pairs from an event."""
+    async def get_teammate_pairs_from_previous_event(
+        self, group_id: UUID, current_event_id: UUID
+    ) -> List[tuple]:
+        """
+        Get all teammate pairs from the group's previous completed event.
+
+        The event is picked as in EventsRepository.get_previous_event, in the
+        same query, and both teams of each game are read in one pass.
+        """
         rows = await self.conn.fetch(
             """
+            WITH prev AS (
+                SELECT id
+                FROM events
+                WHERE group_id = $1
+                  AND status = 'COMPLETED'
+                  AND id != $2
+                ORDER BY starts_at DESC NULLS LAST, created_at DESC
+                LIMIT 1
+            )
             SELECT DISTINCT
-                LEAST(team1_p1, team1_p2) as p1,
-                GREATEST(team1_p1, team1_p2) as p2
-            FROM games
-            WHERE event_id = $1
-            UNION
-            SELECT DISTINCT
-                LEAST(team2_p1, team2_p2) as p1,
-                GREATEST(team2_p1, team2_p2) as p2
-            FROM games
-            WHERE event_id = $1
+                LEAST(t.a, t.b) as p1,
+                GREATEST(t.a, t.b) as p2
+            FROM games g
+            JOIN prev ON prev.id = g.event_id
+            CROSS JOIN LATERAL (
+                VALUES (g.team1_p1, g.team1_p2), (g.team2_p1, g.team2_p2)
+            ) AS t(a, b)
             """,
-            event_id,
+            group_id,
+            current_event_id,
         )
-        return [(row["p1"], row["p2"]) for row in rows]
+        return [(p1, p2) for p1, p2 in rows]
 
 
 
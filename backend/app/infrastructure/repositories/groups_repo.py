@@ -1,8 +1,13 @@
-import json
 from typing import Any, Dict, List, Optional
 from uuid import UUID
 
-from asyncpg import Connection
+from asyncpg import Connection, Record
+
+# Full group row as returned to services; needs `groups g` joined with the owner's `users u`
+GROUP_COLUMNS = (
+    "g.id, g.owner_user_id, u.clerk_user_id, g.name, g.sport, g.settings_json, "
+    "g.created_at, g.updated_at, g.is_archived"
+)
 
 
 class GroupsRepository:
@@ -15,25 +20,30 @@ class GroupsRepository:
         self, owner_user_id: str, name: str, sport: str, settings: Dict[str, Any]
     ) -> Dict[str, Any]:
         """Create a new group."""
+        # Join the owner onto the inserted row to include clerk_user_id
         row = await self.conn.fetchrow(
-            """
-            INSERT INTO groups (owner_user_id, name, sport, settings_json)
-            VALUES ($1, $2, $3, $4)
-            RETURNING id
+            f"""
+            WITH g AS (
+                INSERT INTO groups (owner_user_id, name, sport, settings_json)
+                VALUES ($1, $2, $3, $4)
+                RETURNING *
+            )
+            SELECT {GROUP_COLUMNS}
+            FROM g
+            JOIN users u ON u.id = g.owner_user_id
             """,
             UUID(owner_user_id),
             name,
             sport,
-            json.dumps(settings),
+            settings,
         )
-        # Fetch via get_by_id to include clerk_user_id from JOIN
-        return await self.get_by_id(row["id"])
+        return self._row_to_dict(row)
 
     async def get_by_id(self, group_id: UUID) -> Optional[Dict[str, Any]]:
         """Get a group by ID."""
         row = await self.conn.fetchrow(
-            """
-            SELECT g.id, g.owner_user_id, u.clerk_user_id, g.name, g.sport, g.settings_json, g.created_at, g.updated_at, g.is_archived
+            f"""
+            SELECT {GROUP_COLUMNS}
             FROM groups g
             JOIN users u ON u.id = g.owner_user_id
             WHERE g.id = $1
@@ -42,8 +52,87 @@ class GroupsRepository:
         )
         return self._row_to_dict(row) if row else None
 
-    async def list_by_owner(self, owner_user_id: str) -> List[Dict[str, Any]]:
-        """List all groups owned by a user."""
+    async def get_by_id_for_owner(
+        self, group_id: UUID, owner_user_id: str
+    ) -> Optional[Dict[str, Any]]:
+        """Get a group by ID only if it is owned by the given user."""
+        row = await self.conn.fetchrow(
+            f"""
+            SELECT {GROUP_COLUMNS}
+            FROM groups g
+            JOIN users u ON u.id = g.owner_user_id
+            WHERE g.id = $1 AND g.owner_user_id = $2
+            """,
+            group_id,
+            UUID(owner_user_id),
+        )
+        return self._row_to_dict(row)
+
+    async def get_by_id_for_owner_with_player(
+        self, group_id: UUID, owner_user_id: str, player_id: UUID
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get an owned group (as get_by_id_for_owner does) plus one player in the same query.
+
+        The group dict gets a "player" entry with the player's owner_user_id and
+        user_id, or None if the player doesn't exist.
+        """
+        row = await self.conn.fetchrow(
+            f"""
+            SELECT {GROUP_COLUMNS},
+                   p.id AS player_id, p.owner_user_id AS player_owner_user_id,
+                   p.user_id AS player_user_id
+            FROM groups g
+            JOIN users u ON u.id = g.owner_user_id
+            LEFT JOIN players p ON p.id = $3
+            WHERE g.id = $1 AND g.owner_user_id = $2
+            """,
+            group_id,
+            UUID(owner_user_id),
+            player_id,
+        )
+        if row is None:
+            return None
+        data = self._row_to_dict(row)
+        found = data.pop("player_id") is not None
+        player = {
+            "owner_user_id": data.pop("player_owner_user_id"),
+            "user_id": data.pop("player_user_id"),
+        }
+        data["player"] = player if found else None
+        return data
+
+    async def has_access(self, group_id: UUID, user_id: str) -> Optional[bool]:
+        """
+        Check whether a user owns or is a member of a group, in one query.
+
+        Returns None if the group doesn't exist.
+        """
+        return await self.conn.fetchval(
+            """
+            SELECT g.owner_user_id = $2 OR EXISTS (
+                SELECT 1
+                FROM group_players gp
+                JOIN players p ON p.id = gp.player_id
+                WHERE gp.group_id = g.id AND p.user_id = $2
+            )
+            FROM groups g
+            WHERE g.id = $1
+            """,
+            group_id,
+            UUID(user_id),
+        )
+
+    async def exists(self, group_id: UUID) -> bool:
+        """Check whether a group exists."""
+        val = await self.conn.fetchval(
+            "SELECT 1 FROM groups WHERE id = $1",
+            group_id,
+        )
+        return val is not None
+
+    async def list_by_owner(self, owner_user_id: str) -> List[Record]:
+        """List all groups owned by a user (rows are returned as-is for list responses)."""
         rows = await self.conn.fetch(
             """
             SELECT 
@@ -57,10 +146,10 @@ class GroupsRepository:
             """,
             UUID(owner_user_id),
         )
-        return [dict(row) for row in rows]
+        return rows
 
-    async def list_member_groups(self, user_id: str) -> List[Dict[str, Any]]:
-        """List groups where the user is a member (via linked player)."""
+    async def list_member_groups(self, user_id: str) -> List[Record]:
+        """List groups where the user is a member via linked player (rows returned as-is)."""
         rows = await self.conn.fetch(
             """
             SELECT 
@@ -76,36 +165,53 @@ class GroupsRepository:
             """,
             UUID(user_id),
         )
-        return [dict(row) for row in rows]
+        return rows
+
+    async def update_name(self, group_id: UUID, name: str) -> Optional[Dict[str, Any]]:
+        """Rename a group."""
+        row = await self.conn.fetchrow(
+            f"""
+            UPDATE groups g
+            SET name = $2, updated_at = NOW()
+            FROM users u
+            WHERE g.id = $1 AND u.id = g.owner_user_id
+            RETURNING {GROUP_COLUMNS}
+            """,
+            group_id,
+            name,
+        )
+        return self._row_to_dict(row)
 
     async def archive(self, group_id: UUID) -> Optional[Dict[str, Any]]:
         """Archive a group."""
-        await self.conn.execute(
-            """
-            UPDATE groups
+        row = await self.conn.fetchrow(
+            f"""
+            UPDATE groups g
             SET is_archived = TRUE, updated_at = NOW()
-            WHERE id = $1
+            FROM users u
+            WHERE g.id = $1 AND u.id = g.owner_user_id
+            RETURNING {GROUP_COLUMNS}
             """,
             group_id,
         )
-        # Fetch via get_by_id to include clerk_user_id from JOIN
-        return await self.get_by_id(group_id)
+        return self._row_to_dict(row)
 
     async def update_settings(
         self, group_id: UUID, settings: Dict[str, Any]
     ) -> Optional[Dict[str, Any]]:
         """Update group settings."""
-        await self.conn.execute(
-            """
-            UPDATE groups
+        row = await self.conn.fetchrow(
+            f"""
+            UPDATE groups g
             SET settings_json = $2, updated_at = NOW()
-            WHERE id = $1
+            FROM users u
+            WHERE g.id = $1 AND u.id = g.owner_user_id
+            RETURNING {GROUP_COLUMNS}
             """,
             group_id,
-            json.dumps(settings),
+            settings,
         )
-        # Fetch via get_by_id to include clerk_user_id from JOIN
-        return await self.get_by_id(group_id)
+        return self._row_to_dict(row)
 
     async def delete(self, group_id: UUID) -> bool:
         """Delete a group."""
@@ -121,12 +227,9 @@ class GroupsRepository:
             return None
 
         data = dict(row)
+        # JSONB is decoded by the pool's connection codec
         if "settings_json" in data and data["settings_json"]:
-            if isinstance(data["settings_json"], str):
-                data["settings"] = json.loads(data["settings_json"])
-            else:
-                data["settings"] = data["settings_json"]
-            del data["settings_json"]
+            data["settings"] = data.pop("settings_json")
         return data
 
 
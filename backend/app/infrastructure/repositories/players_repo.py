@@ -1,7 +1,46 @@
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set
 from uuid import UUID
 
-from asyncpg import Connection
+from asyncpg import Connection, Record
+
+# Skill-adjusted starting rating, with the base rating bound to $2.
+# ADVANCED starts 10% of base above it, BEGINNER 10% below, everyone else at base.
+SKILL_INITIAL_RATING_SQL = """
+    CASE skill_level
+        WHEN 'ADVANCED' THEN $2::int + (100 * $2::int / 1000)
+        WHEN 'BEGINNER' THEN $2::int - (100 * $2::int / 1000)
+        ELSE $2::int
+    END
+"""
+
+# Share of games won, ties counting half, to 3 places (0 before any games)
+WIN_RATE_SQL = """
+    COALESCE(
+        ROUND((gp.wins + 0.5 * gp.ties)::NUMERIC / NULLIF(gp.games_played, 0), 3), 0
+    )::float8"""
+
+# Group player columns plus display name, linked user and win rate (never NULL,
+# already a float); expects aliases
+# gp (group_players), p (players) and u (users, LEFT JOINed)
+GROUP_PLAYER_COLUMNS = f"""
+    gp.id, gp.group_id, gp.player_id, gp.membership_type, gp.skill_level, gp.role, gp.rating,
+    gp.games_played, gp.wins, gp.losses, gp.ties,
+    p.display_name, u.clerk_user_id as user_id, gp.created_at, gp.updated_at,
+    {WIN_RATE_SQL} AS win_rate
+"""
+
+
+# A group's players by rating. The text is built once so it is identical on
+# every call; the pool is behind pgbouncer (statement_cache_size=0), so it is
+# not kept as a PreparedStatement.
+LIST_BY_GROUP_SQL = f"""
+    SELECT {GROUP_PLAYER_COLUMNS}
+    FROM group_players gp
+    JOIN players p ON p.id = gp.player_id
+    LEFT JOIN users u ON u.id = p.user_id
+    WHERE gp.group_id = $1
+    ORDER BY gp.rating DESC
+"""
 
 
 class PlayersRepository:
@@ -39,10 +78,61 @@ class PlayersRepository:
         )
         return dict(row) if row else None
 
+    async def get_by_id_for_owner(
+        self, player_id: UUID, owner_user_id: str
+    ) -> Optional[Dict[str, Any]]:
+        """Get a player by ID only if it is owned by the given user."""
+        row = await self.conn.fetchrow(
+            """
+            SELECT id, owner_user_id, display_name, notes, user_id, invite_token, created_at, updated_at
+            FROM players
+            WHERE id = $1 AND owner_user_id = $2
+            """,
+            player_id,
+            UUID(owner_user_id),
+        )
+        return dict(row) if row else None
+
+    async def exists(self, player_id: UUID) -> bool:
+        """Check whether a player exists."""
+        val = await self.conn.fetchval(
+            "SELECT 1 FROM players WHERE id = $1",
+            player_id,
+        )
+        return val is not None
+
+    async def check_ownership(
+        self, player_ids: List[UUID], owner_user_id: str, linked_user_id: UUID
+    ) -> tuple[Set[UUID], Set[UUID], Set[UUID]]:
+        """
+        Check several players against an owner in one aggregate query.
+
+        Returns (missing_ids, foreign_ids, linked_ids): players that don't exist,
+        players owned by someone else, and players linked to linked_user_id.
+        """
+        row = await self.conn.fetchrow(
+            """
+            SELECT
+                array_agg(r.id) FILTER (WHERE p.id IS NULL) AS missing_ids,
+                array_agg(r.id) FILTER (WHERE p.owner_user_id <> $2) AS foreign_ids,
+                array_agg(r.id) FILTER (WHERE p.user_id = $3) AS linked_ids
+            FROM unnest($1::uuid[]) AS r(id)
+            LEFT JOIN players p ON p.id = r.id
+            """,
+            player_ids,
+            UUID(owner_user_id),
+            linked_user_id,
+        )
+        return (
+            set(row["missing_ids"] or ()),
+            set(row["foreign_ids"] or ()),
+            set(row["linked_ids"] or ()),
+        )
+
     async def list_by_owner(
         self, owner_user_id: str, search: Optional[str] = None
-    ) -> List[Dict[str, Any]]:
-        """List all players owned by a user."""
+    ) -> List[Record]:
+        """List all players owned by a user (rows are returned as-is for list responses)."""
         if search:
             rows = await self.conn.fetch(
                 """
@@ -64,7 +154,7 @@ class PlayersRepository:
                 """,
                 UUID(owner_user_id),
             )
-        return [dict(row) for row in rows]
+        return rows
 
     async def list_by_linked_user(self, user_id: str) -> List[Dict[str, Any]]:
         """List players linked to a user."""
@@ -85,8 +175,14 @@ class PlayersRepository:
         notes: Optional[str] = None,
         user_id: Optional[str] = None,
         invite_token: Optional[str] = None,
+        owner_user_id: Optional[str] = None,
     ) -> Optional[Dict[str, Any]]:
-        """Update a player."""
+        """
+        Update a player.
+
+        If owner_user_id is given, only a player owned by that user is updated;
+        None is returned when the player is missing or owned by someone else.
+        """
         # Build dynamic update
         updates = []
         params = [player_id]
@@ -113,12 +209,21 @@ class PlayersRepository:
             param_idx += 1
 
         if not updates:
-            return await self.get_by_id(player_id)
+            player = await self.get_by_id(player_id)
+            if player and owner_user_id is not None and str(player["owner_user_id"]) != owner_user_id:
+                return None
+            return player
+
+        owner_filter = ""
+        if owner_user_id is not None:
+            owner_filter = f" AND owner_user_id = ${param_idx}"
+            params.append(UUID(owner_user_id))
+            param_idx += 1
 
         query = f"""
             UPDATE players
             SET {', '.join(updates)}, updated_at = NOW()
-            WHERE id = $1
+            WHERE id = $1{owner_filter}
             RETURNING id, display_name, notes, user_id, invite_token, created_at, updated_at
         """
 
@@ -152,43 +257,36 @@ class PlayersRepository:
         Create multiple players at once.
         Returns (created_players, skipped_names) where skipped_names are duplicates.
         """
-        created = []
-        skipped = []
-        owner_uuid = UUID(owner_user_id)
+        names = [name for n in names if (name := n.strip())]
 
-        # Get existing player names for this owner to check for duplicates
-        existing = await self.conn.fetch(
+        # Case-insensitive repeats within the request keep their first spelling
+        seen = set()
+        to_create = []
+        for name in names:
+            if name.lower() not in seen:
+                seen.add(name.lower())
+                to_create.append(name)
+
+        # Check for existing names (case-insensitive) in the INSERT itself, so
+        # only this owner's matching names are looked at and it is one round trip
+        rows = await self.conn.fetch(
             """
-            SELECT LOWER(display_name) as name
-            FROM players
-            WHERE owner_user_id = $1
+            INSERT INTO players (owner_user_id, display_name)
+            SELECT $1, n.name FROM unnest($2::text[]) AS n(name)
+            WHERE NOT EXISTS (
+                SELECT 1 FROM players p
+                WHERE p.owner_user_id = $1 AND LOWER(p.display_name) = LOWER(n.name)
+            )
+            RETURNING id, display_name, notes, created_at, updated_at
             """,
-            owner_uuid,
+            UUID(owner_user_id),
+            to_create,
         )
-        existing_names = {row["name"] for row in existing}
 
-        for name in names:
-            name = name.strip()
-            if not name:
-                continue
-
-            # Check for duplicate (case-insensitive)
-            if name.lower() in existing_names:
-                skipped.append(name)
-                continue
-
-            # Create the player
-            row = await self.conn.fetchrow(
-                """
-                INSERT INTO players (owner_user_id, display_name)
-                VALUES ($1, $2)
-                RETURNING id, display_name, notes, created_at, updated_at
-                """,
-                owner_uuid,
-                name,
-            )
-            created.append(dict(row))
-            existing_names.add(name.lower())
+        # Return rows in request order; every name not inserted was a duplicate
+        created_by_name = {row["display_name"]: dict(row) for row in rows}
+        created = [created_by_name[name] for name in to_create if name in created_by_name]
+        skipped = [name for name in names if name not in created_by_name]
 
         return created, skipped
 
@@ -208,13 +306,32 @@ class GroupPlayersRepository:
         skill_level: Optional[str] = None,
         role: str = "PLAYER",
     ) -> Dict[str, Any]:
-        """Add a player to a group with optional skill level for subs."""
+        """
+        Add a player to a group with optional skill level for subs.
+
+        Returns the full group player row (with display name and win rate); if the
+        player is already in the group, the existing row is returned.
+        """
+        # The existing row is read in the same statement when the insert
+        # conflicts, so either way it's one round trip
         row = await self.conn.fetchrow(
-            """
-            INSERT INTO group_players (group_id, player_id, rating, membership_type, skill_level, role)
-            VALUES ($1, $2, $3, $4::membership_type, $5, $6)
-            ON CONFLICT (group_id, player_id) DO NOTHING
-            RETURNING id, group_id, player_id, membership_type, skill_level, role, rating, games_played, wins, losses, ties, created_at
+            f"""
+            WITH ins AS (
+                INSERT INTO group_players (group_id, player_id, rating, membership_type, skill_level, role)
+                VALUES ($1, $2, $3, $4::membership_type, $5, $6)
+                ON CONFLICT (group_id, player_id) DO NOTHING
+                RETURNING *
+            ), gp AS (
+                SELECT * FROM ins
+                UNION ALL
+                SELECT * FROM group_players
+                WHERE group_id = $1 AND player_id = $2
+                AND NOT EXISTS (SELECT 1 FROM ins)
+            )
+            SELECT {GROUP_PLAYER_COLUMNS}
+            FROM gp
+            JOIN players p ON p.id = gp.player_id
+            LEFT JOIN users u ON u.id = p.user_id
             """,
             group_id,
             player_id,
@@ -224,18 +341,32 @@ class GroupPlayersRepository:
             role,
         )
         if row is None:
-            # Already exists, fetch it
+            # Added concurrently, after this statement's snapshot was taken
             row = await self.conn.fetchrow(
-                """
-                SELECT id, group_id, player_id, membership_type, skill_level, role, rating, games_played, wins, losses, ties, created_at
-                FROM group_players
-                WHERE group_id = $1 AND player_id = $2
+                f"""
+                SELECT {GROUP_PLAYER_COLUMNS}
+                FROM group_players gp
+                JOIN players p ON p.id = gp.player_id
+                LEFT JOIN users u ON u.id = p.user_id
+                WHERE gp.group_id = $1 AND gp.player_id = $2
                 """,
                 group_id,
                 player_id,
             )
         return dict(row)
 
+    async def lock_group(self, group_id: UUID) -> None:
+        """
+        Take a transaction-scoped advisory lock on a group's membership.
+
+        Must be called inside a transaction; the lock is released at commit or
+        rollback, so it is safe behind pgbouncer's transaction pooling.
+        """
+        await self.conn.execute(
+            "SELECT pg_advisory_xact_lock(hashtext($1::text))",
+            str(group_id),
+        )
+
     async def bulk_add_players_to_group(
         self,
         group_id: UUID,
@@ -245,46 +376,51 @@ class GroupPlayersRepository:
         Add multiple players to a group at once.
         Each player dict should have: player_id, membership_type, initial_rating, skill_level
         Returns (added_players, skipped_player_ids) where skipped are already in the group.
+        Added players are full group player rows, as returned by get_by_id.
+
+        Callers pass a connection inside a transaction, holding lock_group for
+        this group, so the insert and the checks before it commit together.
         """
-        added = []
-        skipped = []
+        # Only the first entry for a player is inserted; repeats are skipped
+        unique_players: Dict[UUID, Dict[str, Any]] = {}
+        for player_data in players:
+            unique_players.setdefault(player_data["player_id"], player_data)
 
-        # Get existing player_ids in this group
-        existing = await self.conn.fetch(
-            """
-            SELECT player_id FROM group_players WHERE group_id = $1
+        # One multi-row INSERT; players already in the group hit the conflict and
+        # are left out of the result
+        rows = await self.conn.fetch(
+            f"""
+            WITH gp AS (
+                INSERT INTO group_players (group_id, player_id, rating, membership_type, skill_level, role)
+                SELECT $1, u.player_id, u.rating, u.membership_type::membership_type, u.skill_level, u.role
+                FROM unnest($2::uuid[], $3::numeric[], $4::text[], $5::text[], $6::text[])
+                    AS u(player_id, rating, membership_type, skill_level, role)
+                ON CONFLICT (group_id, player_id) DO NOTHING
+                RETURNING *
+            )
+            SELECT {GROUP_PLAYER_COLUMNS}
+            FROM gp
+            JOIN players p ON p.id = gp.player_id
+            LEFT JOIN users u ON u.id = p.user_id
             """,
             group_id,
+            list(unique_players),
+            [p.get("initial_rating", 1000) for p in unique_players.values()],
+            [p.get("membership_type", "PERMANENT") for p in unique_players.values()],
+            [p.get("skill_level") for p in unique_players.values()],  # None for permanent players
+            [p.get("role", "PLAYER") for p in unique_players.values()],
         )
-        existing_player_ids = {row["player_id"] for row in existing}
+        added_by_player = {row["player_id"]: dict(row) for row in rows}
 
+        # Report added rows and skipped ids in request order
+        added = []
+        skipped = []
         for player_data in players:
-            player_id = player_data["player_id"]
-            membership_type = player_data.get("membership_type", "PERMANENT")
-            initial_rating = player_data.get("initial_rating", 1000)
-            skill_level = player_data.get("skill_level")  # None for permanent players
-
-            role = player_data.get("role", "PLAYER")
-
-            if player_id in existing_player_ids:
-                skipped.append(str(player_id))
-                continue
-
-            row = await self.conn.fetchrow(
-                """
-                INSERT INTO group_players (group_id, player_id, rating, membership_type, skill_level, role)
-                VALUES ($1, $2, $3, $4::membership_type, $5, $6)
-                RETURNING id, group_id, player_id, membership_type, skill_level, role, rating, games_played, wins, losses, ties, created_at
-                """,
-                group_id,
-                player_id,
-                initial_rating,
-                membership_type,
-                skill_level,
-                role,
-            )
-            added.append(dict(row))
-            existing_player_ids.add(player_id)
+            row = added_by_player.pop(player_data["player_id"], None)
+            if row is None:
+                skipped.append(str(player_data["player_id"]))
+            else:
+                added.append(row)
 
         return added, skipped
 
@@ -294,8 +430,15 @@ class GroupPlayersRepository:
         membership_type: Optional[str] = None,
         skill_level: Optional[str] = None,
         role: Optional[str] = None,
+        group_id: Optional[UUID] = None,
     ) -> Optional[Dict[str, Any]]:
-        """Update a group player's membership type, skill level, and role."""
+        """
+        Update a group player's membership type, skill level, and role.
+
+        Returns the full group player row (as get_by_id does). If group_id is
+        given, only a group player in that group is updated; None is returned
+        when it is missing or belongs to another group.
+        """
         # Build dynamic update
         updates = []
         params = [group_player_id]
@@ -317,31 +460,56 @@ class GroupPlayersRepository:
             params.append(role)
             param_idx += 1
         
+        group_filter = ""
+        if group_id is not None:
+            group_filter = f" AND gp.group_id = ${param_idx}"
+            params.append(group_id)
+            param_idx += 1
+
         if not updates:
-            return await self.get_by_id(group_player_id)
-        
+            # Nothing to change: just read the row, under the same group filter
+            row = await self.conn.fetchrow(
+                f"""
+                SELECT {GROUP_PLAYER_COLUMNS}
+                FROM group_players gp
+                JOIN players p ON p.id = gp.player_id
+                LEFT JOIN users u ON u.id = p.user_id
+                WHERE gp.id = $1{group_filter}
+                """,
+                *params,
+            )
+            return dict(row) if row else None
+
         updates.append("updated_at = NOW()")
         query = f"""
-            UPDATE group_players
-            SET {', '.join(updates)}
-            WHERE id = $1
-            RETURNING id, group_id, player_id, membership_type, skill_level, role, rating, games_played, wins, losses, ties, created_at, updated_at
+            WITH updated AS (
+                UPDATE group_players gp
+                SET {', '.join(updates)}
+                WHERE gp.id = $1{group_filter}
+                RETURNING gp.*
+            )
+            SELECT {GROUP_PLAYER_COLUMNS}
+            FROM updated gp
+            JOIN players p ON p.id = gp.player_id
+            LEFT JOIN users u ON u.id = p.user_id
         """
         row = await self.conn.fetchrow(query, *params)
         return dict(row) if row else None
 
 
+    async def exists(self, group_player_id: UUID) -> bool:
+        """Check whether a group player exists."""
+        val = await self.conn.fetchval(
+            "SELECT 1 FROM group_players WHERE id = $1",
+            group_player_id,
+        )
+        return val is not None
+
     async def get_by_id(self, group_player_id: UUID) -> Optional[Dict[str, Any]]:
         """Get a group player by ID."""
         row = await self.conn.fetchrow(
-            """
-            SELECT gp.id, gp.group_id, gp.player_id, gp.membership_type, gp.skill_level, gp.role, gp.rating, 
-                   gp.games_played, gp.wins, gp.losses, gp.ties,
-                   p.display_name, u.clerk_user_id as user_id, gp.created_at, gp.updated_at,
-                   CASE WHEN gp.games_played > 0 
-                        THEN ROUND((gp.wins + 0.5 * gp.ties)::NUMERIC / gp.games_played, 3)
-                        ELSE 0 
-                   END AS win_rate
+            f"""
+            SELECT {GROUP_PLAYER_COLUMNS}
             FROM group_players gp
             JOIN players p ON p.id = gp.player_id
             LEFT JOIN users u ON u.id = p.user_id
@@ -351,26 +519,94 @@ class GroupPlayersRepository:
         )
         return dict(row) if row else None
 
-    async def list_by_group(self, group_id: UUID) -> List[Dict[str, Any]]:
-        """List all players in a group."""
-        rows = await self.conn.fetch(
+    async def list_by_group(self, group_id: UUID) -> List[Record]:
+        """List all players in a group (rows are returned as-is for list responses)."""
+        rows = await self.conn.fetch(LIST_BY_GROUP_SQL, group_id)
+        return rows
+
+    async def get_version(self, group_id: UUID) -> str:
+        """
+        Cheap fingerprint of a group's membership, ratings and player names.
+
+        Changes when a group player is added, removed or updated (the
+        updated_at trigger covers rating and result changes), or when one of
+        its players is updated (e.g. renamed). updated_at is NOW(), the start
+        time of the writing transaction, so a change committed after a later
+        started one may not move the maximum; callers caching by this version
+        can serve such a change stale until their cache entry expires.
+        """
+        row = await self.conn.fetchrow(
             """
-            SELECT gp.id, gp.group_id, gp.player_id, gp.membership_type, gp.skill_level, gp.role, gp.rating,
+            SELECT COUNT(*) AS player_count,
+                   MAX(GREATEST(gp.updated_at, p.updated_at)) AS last_updated
+            FROM group_players gp
+            JOIN players p ON p.id = gp.player_id
+            WHERE gp.group_id = $1
+            """,
+            group_id,
+        )
+        last_updated = row["last_updated"]
+        return f"{row['player_count']}:{last_updated.timestamp() if last_updated else 0}"
+
+    async def list_by_group_ranked(self, group_id: UUID) -> List[Record]:
+        """
+        List a group's standings by rating, with each player's rank (ties share
+        a rank). Only the columns rankings show are selected; rating as float8.
+        """
+        rows = await self.conn.fetch(
+            f"""
+            SELECT RANK() OVER (ORDER BY gp.rating DESC) AS rank,
+                   gp.player_id, p.display_name, gp.rating::float8 AS rating,
                    gp.games_played, gp.wins, gp.losses, gp.ties,
-                   p.display_name, u.clerk_user_id as user_id,
-                   CASE WHEN gp.games_played > 0 
-                        THEN ROUND((gp.wins + 0.5 * gp.ties)::NUMERIC / gp.games_played, 3)
-                        ELSE 0 
-                   END AS win_rate
+                   {WIN_RATE_SQL} AS win_rate
+            FROM group_players gp
+            JOIN players p ON p.id = gp.player_id
+            WHERE gp.group_id = $1
+            ORDER BY gp.rating DESC
+            """,
+            group_id,
+        )
+        return rows
+
+    async def list_by_group_with_deltas(self, group_id: UUID) -> List[Record]:
+        """
+        List all players in a group with their rating change since the most
+        recent completed event (rating_delta is NULL if they didn't play in it).
+        """
+        rows = await self.conn.fetch(
+            f"""
+            WITH last_event AS (
+                SELECT id FROM events
+                WHERE group_id = $1 AND status = 'COMPLETED'
+                ORDER BY starts_at DESC, created_at DESC
+                LIMIT 1
+            )
+            SELECT {GROUP_PLAYER_COLUMNS},
+                   (gp.rating - ru.rating_before)::float8 AS rating_delta
             FROM group_players gp
             JOIN players p ON p.id = gp.player_id
             LEFT JOIN users u ON u.id = p.user_id
+            LEFT JOIN rating_updates ru
+                ON ru.group_player_id = gp.id
+                AND ru.event_id = (SELECT id FROM last_event)
             WHERE gp.group_id = $1
             ORDER BY gp.rating DESC
             """,
             group_id,
         )
-        return [dict(row) for row in rows]
+        return rows
+
+    async def filter_in_group(self, group_id: UUID, group_player_ids: List[UUID]) -> Set[UUID]:
+        """Return which of the given group player IDs belong to the group."""
+        rows = await self.conn.fetch(
+            """
+            SELECT id FROM group_players
+            WHERE group_id = $1 AND id = ANY($2::uuid[])
+            """,
+            group_id,
+            group_player_ids,
+        )
+        return {row["id"] for row in rows}
 
     async def get_by_ids(self, group_player_ids: List[UUID]) -> List[Dict[str, Any]]:
         """Get multiple group players by IDs."""
@@ -417,6 +653,54 @@ class GroupPlayersRepository:
             ties_delta,
         )
 
+    async def reset_ratings(self, group_id: UUID, base_rating: int) -> Dict[UUID, float]:
+        """
+        Reset every player in a group to their starting rating with cleared stats.
+
+        Returns the starting rating per group player.
+        """
+        rows = await self.conn.fetch(
+            f"""
+            UPDATE group_players
+            SET rating = {SKILL_INITIAL_RATING_SQL},
+                wins = 0, losses = 0, ties = 0, games_played = 0, updated_at = NOW()
+            WHERE group_id = $1
+            RETURNING id, rating::float8 AS rating
+            """,
+            group_id,
+            int(base_rating),
+        )
+        return {row["id"]: row["rating"] for row in rows}
+
+    async def get_starting_ratings(self, group_id: UUID, base_rating: int) -> Dict[UUID, float]:
+        """Get each group player's skill-based starting rating without writing anything."""
+        rows = await self.conn.fetch(
+            f"""
+            SELECT id, ({SKILL_INITIAL_RATING_SQL})::float8 AS rating
+            FROM group_players
+            WHERE group_id = $1
+            """,
+            group_id,
+            int(base_rating),
+        )
+        return {row["id"]: row["rating"] for row in rows}
+
+    async def copy_to_group(
+        self, source_group_id: UUID, target_group_id: UUID, base_rating: int
+    ) -> None:
+        """Copy all players of a group into another group with reset ratings and stats."""
+        await self.conn.execute(
+            f"""
+            INSERT INTO group_players (group_id, player_id, rating, membership_type, skill_level, role)
+            SELECT $3, player_id, {SKILL_INITIAL_RATING_SQL}, membership_type, skill_level, role
+            FROM group_players
+            WHERE group_id = $1
+            """,
+            source_group_id,
+            int(base_rating),
+            target_group_id,
+        )
+
     async def set_rating(
         self,
         group_player_id: UUID,
@@ -433,13 +717,63 @@ class GroupPlayersRepository:
             rating,
         )
 
-    async def remove_from_group(self, group_id: UUID, group_player_id: UUID) -> bool:
-        """Remove a player from a group."""
-        result = await self.conn.execute(
-            "DELETE FROM group_players WHERE id = $1 AND group_id = $2",
-            group_player_id,
+    async def set_ratings_and_stats(
+        self,
+        group_id: UUID,
+        group_player_ids: List[UUID],
+        ratings: List[float],
+        games_played: List[int],
+        wins: List[int],
+        losses: List[int],
+        ties: List[int],
+    ) -> None:
+        """Overwrite ratings and stats for many players of a group in one statement (parallel lists)."""
+        if not group_player_ids:
+            return
+        await self.conn.execute(
+            """
+            UPDATE group_players gp
+            SET rating = u.rating, games_played = u.games_played,
+                wins = u.wins, losses = u.losses, ties = u.ties, updated_at = NOW()
+            FROM unnest($1::uuid[], $2::numeric[], $3::int[], $4::int[], $5::int[], $6::int[])
+                AS u(id, rating, games_played, wins, losses, ties)
+            WHERE gp.id = u.id AND gp.group_id = $7
+            """,
+            group_player_ids,
+            ratings,
+            games_played,
+            wins,
+            losses,
+            ties,
             group_id,
         )
+
+    async def remove_from_group(
+        self, group_id: UUID, group_player_id: UUID, owner_user_id: Optional[str] = None
+    ) -> bool:
+        """
+        Remove a player from a group.
+
+        If owner_user_id is given, nothing is deleted unless that user owns the group.
+        """
+        if owner_user_id is None:
+            result = await self.conn.execute(
+                "DELETE FROM group_players WHERE id = $1 AND group_id = $2",
+                group_player_id,
+                group_id,
+            )
+        else:
+            result = await self.conn.execute(
+                """
+                DELETE FROM group_players gp
+                USING groups g
+                WHERE gp.id = $1 AND gp.group_id = $2
+                  AND g.id = gp.group_id AND g.owner_user_id = $3
+                """,
+                group_player_id,
+                group_id,
+                UUID(owner_user_id),
+            )
         return result == "DELETE 1"
 
     async def is_member(self, user_id: str, group_id: UUID) -> bool:
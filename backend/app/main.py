@@ -1,5 +1,5 @@
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Sequence
 import os
 
 from fastapi import FastAPI, Request
@@ -47,18 +47,18 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
 
 class CORSErrorMiddleware(BaseHTTPMiddleware):
     """Middleware to ensure CORS headers are added even on errors."""
-    
+
+    def __init__(self, app, cors_origins: Sequence[str] = ("*",)):
+        super().__init__(app)
+        self.cors_origins = tuple(cors_origins)
+
     async def dispatch(self, request: Request, call_next):
         try:
             response = await call_next(request)
             return response
         except Exception as e:
             logger.error(f"Unhandled exception: {e}")
-            try:
-                settings = get_settings()
-                cors_origins = settings.cors_origins
-            except:
-                cors_origins = ["*"]
+            cors_origins = self.cors_origins
             
             origin = request.headers.get("origin", "")
             
@@ -68,7 +68,7 @@ class CORSErrorMiddleware(BaseHTTPMiddleware):
             )
             
             # Add CORS headers if origin is allowed
-            if cors_origins == ["*"] or origin in cors_origins:
+            if cors_origins == ("*",) or origin in cors_origins:
                 response.headers["Access-Control-Allow-Origin"] = origin or "*"
                 response.headers["Access-Control-Allow-Credentials"] = "true"
             
@@ -101,7 +101,7 @@ def create_app() -> FastAPI:
         logger.warning(f"Failed to setup rate limiting: {e}")
 
     # CORS - must be added BEFORE other middleware
-    cors_origins = settings.cors_origins if settings else ["*"]
+    cors_origins = settings.cors_origins if settings else ("*",)
     app.add_middleware(
         CORSMiddleware,
         allow_origins=cors_origins,
@@ -112,7 +112,7 @@ def create_app() -> FastAPI:
     )
 
     # Add CORS error handling middleware
-    app.add_middleware(CORSErrorMiddleware)
+    app.add_middleware(CORSErrorMiddleware, cors_origins=cors_origins)
 
     # GZip compression for responses > 500 bytes
     app.add_middleware(GZipMiddleware, minimum_size=500)
@@ -7,8 +7,10 @@ from uuid import uuid4
 from app.domain.matchmaking.constraints import (
     ConstraintChecker,
     ConstraintConfig,
+    ConstraintState,
     Game,
     Player,
+    pair_key,
 )
 
 
@@ -111,6 +113,57 @@ class TestConstraintChecker:
         # 1000 vs 1050 = 5% difference == 5%
         assert self.checker.check_rating_balance(1000, 1050, 0.05)
 
+    def test_rating_imbalance(self):
+        """Test the imbalance is relative to the higher rating, in either order."""
+        assert self.checker.rating_imbalance(1000, 1250) == 0.2
+        assert self.checker.rating_imbalance(1250, 1000) == 0.2
+        assert self.checker.rating_imbalance(0, 0) == 0.0
+
+    def test_validate_game_rating_imbalance(self):
+        """Test that validate_game reports team averages for imbalanced teams."""
+        ratings = (1000, 1100, 1000, 1000)
+        ids = [uuid4() for _ in ratings]
+        players = {pid: Player(id=pid, rating=r) for pid, r in zip(ids, ratings)}
+        game = Game(round_index=0, court_index=0, team1=(ids[0], ids[1]), team2=(ids[2], ids[3]))
+
+        # 1050 vs 1000 is within 5% of 1050, but not within 4%
+        assert self.checker.validate_game(game, [], players, 0.05) == (True, [])
+        assert self.checker.validate_game(game, [], players, 0.04) == (
+            False, ["Rating imbalance: 1050 vs 1000"]
+        )
+
+    def test_validate_game_counts_event_pairs(self):
+        """Test validate_game against teammates and opponents already in the event."""
+        p1, p2, p3, p4, p5, p6 = (uuid4() for _ in range(6))
+        players = {pid: Player(id=pid, rating=1000) for pid in (p1, p2, p3, p4, p5, p6)}
+        existing = [
+            Game(round_index=0, court_index=0, team1=(p1, p3), team2=(p2, p4)),
+            Game(round_index=1, court_index=0, team1=(p4, p5), team2=(p6, p1)),
+        ]
+
+        # p1/p5 were opponents once; every other pair is new
+        valid, violations = self.checker.validate_game(
+            Game(round_index=2, court_index=0, team1=(p1, p2), team2=(p5, p6)),
+            existing, players, 0.05,
+        )
+        assert valid and violations == []
+
+        # p3/p1 (written the other way round) were already teammates
+        valid, violations = self.checker.validate_game(
+            Game(round_index=2, court_index=0, team1=(p3, p1), team2=(p5, p6)),
+            existing, players, 0.05,
+        )
+        assert not valid
+        assert violations == ["Repeated teammate pair in event"]
+
+        # p1 already played against p4 in both games
+        valid, violations = self.checker.validate_game(
+            Game(round_index=2, court_index=0, team1=(p1, p2), team2=(p4, p6)),
+            existing, players, 0.05,
+        )
+        assert not valid
+        assert violations == ["Opponent pair would exceed 2 matches in event"]
+
 
 class TestGame:
     """Tests for the Game dataclass."""
@@ -160,8 +213,28 @@ class TestGame:
         assert len(pairs) == 4
 
 
+class TestConstraintState:
+    """Tests for incremental pair tracking."""
 
+    def test_pair_key_ignores_order(self):
+        """Test that a pair gets the same dense key either way round."""
+        assert pair_key(3, 7, 8) == pair_key(7, 3, 8)
+        assert pair_key(3, 7, 8) != pair_key(3, 6, 8)
+        assert pair_key(6, 7, 8) < 8 * 8
 
+    def test_add_and_remove_game(self):
+        """Test that remove_game undoes add_game, including repeated pairs."""
+        state = ConstraintState(4)
+        teammates = (pair_key(0, 1, 4), pair_key(2, 3, 4))
+        opponents = (
+            pair_key(0, 2, 4), pair_key(0, 3, 4), pair_key(1, 2, 4), pair_key(1, 3, 4),
+        )
 
+        state.add_game(teammates, opponents)
+        state.add_game(teammates, opponents)
+        assert state.teammate_counts[pair_key(1, 0, 4)] == 2
+        assert state.opponent_counts[pair_key(2, 0, 4)] == 2
 
-
+        state.remove_game(teammates, opponents)
+        assert state.teammate_counts[pair_key(0, 1, 4)] == 1
+        assert state.opponent_counts[pair_key(0, 2, 4)] == 1
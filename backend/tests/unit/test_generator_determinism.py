@@ -220,6 +220,49 @@ class TestGeneratorValidation:
                 assert pair not in teammate_pairs, "Teammate pair repeated"
                 teammate_pairs.add(pair)
 
+    def test_no_repeat_teammates_from_previous_event(self):
+        """Test that teammate pairs from the previous event are avoided."""
+        players = self.create_players(8)
+        previous_pairs = {
+            frozenset([players[i].id, players[i + 1].id]) for i in range(0, 8, 2)
+        }
+        config = ConstraintConfig(
+            no_repeat_teammate_in_event=True,
+            no_repeat_teammate_from_previous_event=True,
+            no_repeat_opponent_in_event=True,
+            elo_diff=0.20,
+        )
+
+        gen = ScheduleGenerator(
+            players=players,
+            courts=2,
+            rounds=3,
+            config=config,
+            previous_teammate_pairs=previous_pairs,
+        )
+        result = gen.generate()
+
+        assert result.success
+        for game in result.games:
+            assert not (game.teammate_pairs() & previous_pairs)
+
+    def test_disabled_constraints_allow_repeats(self):
+        """Test that with every hard constraint off, pairings may repeat."""
+        players = self.create_players(4)
+        config = ConstraintConfig(
+            no_repeat_teammate_in_event=False,
+            no_repeat_teammate_from_previous_event=False,
+            no_repeat_opponent_in_event=False,
+            elo_diff=0.25,
+        )
+
+        # Four players only split into three distinct pairs of teams
+        gen = ScheduleGenerator(players=players, courts=1, rounds=5, config=config)
+        result = gen.generate()
+
+        assert result.success
+        assert len(result.games) == 5
+
     def test_no_repeat_opponents_in_event(self):
         """Test that opponents don't repeat more than 2 times within an event."""
         players = self.create_players(8)
@@ -210,3 +210,19 @@ class TestCatchUpEloRating:
 
 
 
+
+    def test_adjust_delta_by_position(self):
+        """Test the gain and loss multipliers on each side of the median."""
+        adjust = self.catchup._adjust_delta
+
+        # 800 is 20% below a 1000 median: gains +20%, losses unchanged
+        assert adjust(10.0, 800, 1000) == pytest.approx(12.0)
+        assert adjust(-10.0, 800, 1000) == -10.0
+
+        # 1200 is 20% above: gains -12%, losses +8%
+        assert adjust(10.0, 1200, 1000) == pytest.approx(8.8)
+        assert adjust(-10.0, 1200, 1000) == pytest.approx(-10.8)
+
+        # At the median, or without a median, deltas are unchanged
+        assert adjust(10.0, 1000, 1000) == 10.0
+        assert adjust(-10.0, 1000, 0) == -10.0
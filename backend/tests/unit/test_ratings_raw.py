@@ -0,0 +1,55 @@
+"""
+Unit tests for the tuple-based rating path shared by all rating systems.
+"""
+import pytest
+from uuid import uuid4
+
+from app.domain.ratings.base import GameForRating, GameResult, PlayerRating
+from app.domain.ratings.catch_up_elo import CatchUpEloRating
+from app.domain.ratings.racs_elo import RacsEloRating
+from app.domain.ratings.serious_elo import SeriousEloRating
+
+
+class TestRawRatingPath:
+    """Tests that calculate_deltas_raw/apply_deltas_raw match the dataclass API."""
+
+    def create_player(self, rating: float, name: str = "Player") -> PlayerRating:
+        """Create a test player."""
+        return PlayerRating(
+            player_id=uuid4(),
+            rating=rating,
+            display_name=name,
+        )
+
+    @pytest.mark.parametrize(
+        "rating_system",
+        [SeriousEloRating(k_factor=32), CatchUpEloRating(), RacsEloRating()],
+        ids=["serious", "catch_up", "racs"],
+    )
+    def test_apply_deltas_raw_matches_dataclass_api(self, rating_system):
+        """Test that the tuple-based path produces the same deltas as calculate_deltas."""
+        players = [self.create_player(rating) for rating in (900, 1050, 1100, 1200, 980, 1010)]
+        p1, p2, p3, p4, p5, p6 = players
+        games = [
+            GameForRating(team1=(p1, p2), team2=(p3, p4), result=GameResult.TEAM1_WIN,
+                          score_team1=11, score_team2=7),
+            GameForRating(team1=(p5, p3), team2=(p6, p1), result=GameResult.TEAM2_WIN),
+            GameForRating(team1=(p2, p6), team2=(p4, p5), result=GameResult.TIE,
+                          score_team1=9, score_team2=9),
+        ]
+        raw_games = [
+            (
+                g.team1[0].player_id, g.team1[1].player_id, g.team2[0].player_id, g.team2[1].player_id,
+                g.team1[0].rating, g.team1[1].rating, g.team2[0].rating, g.team2[1].rating,
+                g.result, g.score_team1, g.score_team2,
+            )
+            for g in games
+        ]
+
+        current_ratings = {p.player_id: p.rating for p in players}
+        expected = rating_system.calculate_deltas(games, dict(current_ratings))
+        deltas = rating_system.apply_deltas_raw(raw_games, current_ratings)
+
+        assert deltas == {pid: d.delta for pid, d in expected.items()}
+        for player_id, delta in expected.items():
+            assert current_ratings[player_id] == delta.rating_after
@@ -248,9 +248,29 @@ class TestSeriousEloRating:
         # No deltas should be returned for UNSET games
         assert len(deltas) == 0
 
+    def test_apply_deltas_updates_ratings_in_place(self):
+        """Test that apply_deltas writes the new ratings back into current_ratings."""
+        p1 = self.create_player(1000, "P1")
+        p2 = self.create_player(1000, "P2")
+        p3 = self.create_player(1000, "P3")
+        p4 = self.create_player(1000, "P4")
 
+        game = GameForRating(
+            team1=(p1, p2),
+            team2=(p3, p4),
+            result=GameResult.TEAM1_WIN,
+        )
 
+        current_ratings = {
+            p1.player_id: 1000,
+            p2.player_id: 1000,
+            p3.player_id: 1000,
+            p4.player_id: 1000,
+        }
 
+        expected = self.rating_system.calculate_deltas([game], dict(current_ratings))
+        deltas = self.rating_system.apply_deltas([game], current_ratings)
 
-
-
+        assert deltas.keys() == expected.keys()
+        for player_id, delta in expected.items():
+            assert current_ratings[player_id] == delta.rating_after
@@ -13,6 +13,25 @@ CREATE INDEX IF NOT EXISTS idx_games_created_at ON games(created_at DESC);
 CREATE INDEX IF NOT EXISTS idx_group_players_group_id ON group_players(group_id);
 CREATE INDEX IF NOT EXISTS idx_group_players_rating ON group_players(group_id, rating DESC);
 
+-- Covering index for the group player list and rankings: rows come back already
+-- in rating order and every group_players column they read is in the index, so
+-- the planner can use an index-only scan instead of visiting the heap
+CREATE INDEX IF NOT EXISTS idx_group_players_list ON group_players(group_id, rating DESC)
+    INCLUDE (id, player_id, membership_type, skill_level, role, games_played,
+             wins, losses, ties, created_at, updated_at);
+-- Supersedes the plain rating index above
+DROP INDEX IF EXISTS idx_group_players_rating;
+-- Refresh planner statistics for the new index. Index-only scans also depend on
+-- an up-to-date visibility map; VACUUM can't run inside the transaction this
+-- script runs in, so if needed run `VACUUM ANALYZE group_players;` on its own
+ANALYZE group_players;
+
+-- Players table indexes
+-- Speeds up: player search (display_name ILIKE '%term%'); a plain btree
+-- can't serve a leading wildcard, a trigram GIN index can
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS idx_players_name_trgm ON players USING gin (display_name gin_trgm_ops);
+
 -- Events table indexes
 -- Speeds up: listing events by group/status, sorting by date
 CREATE INDEX IF NOT EXISTS idx_events_group_id_status ON events(group_id, status);
@@ -26,6 +45,15 @@ CREATE INDEX IF NOT EXISTS idx_rating_updates_player_id ON rating_updates(group_
 -- Composite index for common history query pattern
 CREATE INDEX IF NOT EXISTS idx_games_group_created ON games(event_id, created_at DESC);
 
+-- Match history: a group's completed events newest first (partial, since the
+-- query only ever reads COMPLETED events), then each event's games in
+-- round/court order with every column the query reads, for an index-only scan
+CREATE INDEX IF NOT EXISTS idx_events_completed_date ON events(group_id, starts_at DESC)
+    WHERE status = 'COMPLETED';
+CREATE INDEX IF NOT EXISTS idx_games_history ON games(event_id, round_index, court_index)
+    INCLUDE (id, team1_p1, team1_p2, team2_p1, team2_p2, score_team1, score_team2,
+             team1_elo, team2_elo, result);
+
 -- =====================================================
 -- To verify indexes were created, run:
 -- SELECT indexname FROM pg_indexes WHERE schemaname = 'public';